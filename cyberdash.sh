@@ -2,6 +2,22 @@
 # CyberDash launcher
 # Run as user (not root)
 
+# Fast path: forward to the resident instance over D-Bus without starting
+# Python at all. Falls through to a normal start when nobody answers.
+case "$1" in
+    "")       ACTION="show" ;;
+    --toggle) ACTION="toggle" ;;
+    *)        ACTION="" ;;
+esac
+if [ -n "$ACTION" ] && command -v gdbus &> /dev/null; then
+    if gdbus call --session --dest com.cyberdash.app \
+        --object-path /com/cyberdash/app \
+        --method org.freedesktop.Application.ActivateAction \
+        "$ACTION" "[]" "{}" &> /dev/null; then
+        exit 0
+    fi
+fi
+
 # Set GTK backend based on display server
 if [ -n "$WAYLAND_DISPLAY" ]; then
     export GDK_BACKEND=wayland
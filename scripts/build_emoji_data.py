@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Build src/cyberdash/data/emoji.bin from the Unicode emoji and CLDR data.
+
+Inputs (download once):
+  * emoji-test.txt     https://unicode.org/Public/emoji/latest/emoji-test.txt
+  * CLDR "common" dir  https://github.com/unicode-org/cldr (common/annotations,
+                       common/annotationsDerived)
+
+Usage:
+  python3 scripts/build_emoji_data.py emoji-test.txt cldr/common
+  python3 scripts/build_emoji_data.py emoji-test.txt cldr/common --locales en,es,fr,de
+"""
+
+import argparse
+import importlib.util
+import sys
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+ROOT = Path(__file__).resolve().parent.parent
+PKG = ROOT / "src" / "cyberdash"
+
+# emoji-test.txt group -> CyberDash category
+GROUPS = {
+    "Smileys & Emotion": "smileys",
+    "People & Body":     "smileys",
+    "Animals & Nature":  "animals",
+    "Food & Drink":      "food",
+    "Activities":        "activities",
+    "Travel & Places":   "travel",
+    "Objects":           "objects",
+    "Symbols":           "symbols",
+    "Flags":             "flags",
+}
+
+VS16 = "\ufe0f"  # emoji presentation selector, CLDR omits it
+SKIN_TONES = {chr(cp) for cp in range(0x1F3FB, 0x1F400)}
+
+
+def load_emoji_index_module():
+    """Load services/emoji_index.py without importing the GTK package"""
+    spec = importlib.util.spec_from_file_location(
+        "emoji_index", PKG / "services" / "emoji_index.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_emoji_test(path: Path, skin_tones: bool) -> Dict[str, List[tuple]]:
+    """Fully-qualified emojis grouped by category, with their English name"""
+    categories: Dict[str, List[tuple]] = {cat: [] for cat in dict.fromkeys(GROUPS.values())}
+    category: Optional[str] = None
+
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.startswith("# group:"):
+            category = GROUPS.get(line.split(":", 1)[1].strip())
+            continue
+        if not line.strip() or line.startswith("#") or category is None:
+            continue
+
+        codes, rest = line.split(";", 1)
+        status, comment = rest.split("#", 1)
+        if status.strip() != "fully-qualified":
+            continue
+        emoji = "".join(chr(int(cp, 16)) for cp in codes.split())
+        if not skin_tones and SKIN_TONES & set(emoji):
+            continue
+        # "😀 E1.0 grinning face"
+        name = comment.strip().split(" ", 2)[-1]
+        categories[category].append((emoji, name))
+
+    return categories
+
+
+def parse_annotations(common: Path, locales: Optional[Set[str]]) -> Dict[str, Set[str]]:
+    """emoji (without FE0F) -> keywords and names from every locale"""
+    terms: Dict[str, Set[str]] = {}
+    for sub in ("annotations", "annotationsDerived"):
+        for xml_file in sorted((common / sub).glob("*.xml")):
+            if locales and xml_file.stem not in locales:
+                continue
+            try:
+                root = ET.parse(xml_file).getroot()
+            except ET.ParseError as e:
+                print(f"  skip {xml_file.name}: {e}", file=sys.stderr)
+                continue
+            for node in root.iter("annotation"):
+                cp = node.get("cp")
+                if not cp or not node.text:
+                    continue
+                bucket = terms.setdefault(cp.replace(VS16, ""), set())
+                if node.get("type") == "tts":
+                    bucket.add(node.text.strip())
+                else:
+                    bucket.update(t.strip() for t in node.text.split("|") if t.strip())
+    return terms
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("emoji_test", type=Path, help="path to emoji-test.txt")
+    parser.add_argument("cldr_common", type=Path, help="path to CLDR common/ directory")
+    parser.add_argument("-o", "--output", type=Path, default=PKG / "data" / "emoji.bin")
+    parser.add_argument("--locales", help="comma separated locales (default: all)")
+    parser.add_argument("--skin-tones", action="store_true", help="include skin tone variants")
+    args = parser.parse_args()
+
+    emoji_index = load_emoji_index_module()
+    locales = set(args.locales.split(",")) if args.locales else None
+
+    categories = parse_emoji_test(args.emoji_test, args.skin_tones)
+    annotations = parse_annotations(args.cldr_common, locales)
+
+    dataset = {}
+    for category, entries in categories.items():
+        dataset[category] = [
+            (emoji, sorted(annotations.get(emoji.replace(VS16, ""), set()) | {name}))
+            for emoji, name in entries
+        ]
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    emoji_index.write_index_file(args.output, dataset)
+
+    n_emoji = sum(len(v) for v in dataset.values())
+    size_kb = args.output.stat().st_size // 1024
+    print(f"✓ {n_emoji} emojis, {len(annotations)} annotated → {args.output} ({size_kb} KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
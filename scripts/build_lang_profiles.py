@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Build src/cyberdash/data/lang_profiles.json, the trigram profiles used by
+services/language_id.py for Latin and Cyrillic script languages.
+
+Corpus sources (any mix):
+  * gettext catalogs   --locale-dir /usr/share/locale
+                       translated messages of every installed package; the
+                       English profile is built from the message ids
+  * plain text files   --text-dir corpus/  with one <code>.txt per language
+
+A tenth of each language's lines is held out and the accuracy on it is
+printed, short lines separately.
+
+Usage:
+  python3 scripts/build_lang_profiles.py --locale-dir /usr/share/locale
+  python3 scripts/build_lang_profiles.py --text-dir corpus/ --size 800
+"""
+
+import argparse
+import gettext
+import importlib.util
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+PKG = ROOT / "src" / "cyberdash"
+
+# Languages of services/translator_service.LANGUAGES that share a script
+# with others, and so need a profile
+LANGUAGES = {
+    "Latin": ["en", "es", "fr", "de", "it", "pt", "tr", "pl", "nl", "sv", "da",
+              "fi", "cs", "vi", "id", "hu", "ro"],
+    "Cyrillic": ["ru", "uk"],
+}
+
+# Per-language corpus cap, keeps large catalogs from dominating
+MAX_CHARS = 3_000_000
+
+# printf/format placeholders, markup, URLs, mnemonics
+_NOISE = re.compile(
+    r"%(\([^)]*\))?[-#0 +']*\d*(\.\d+)?[hlLqjzt]*[a-zA-Z%]"
+    r"|\{[^}]*\}|<[^>]*>|&\w+;|https?://\S+|\S+@\S+|[_&](?=\w)"
+)
+
+
+def load_language_id_module():
+    """Load services/language_id.py without importing the GTK package"""
+    spec = importlib.util.spec_from_file_location(
+        "language_id", PKG / "services" / "language_id.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def clean(message: str) -> str:
+    message = message.split("\x04", 1)[-1]  # msgctxt prefix
+    return " ".join(_NOISE.sub(" ", message).split())
+
+
+def read_catalogs(locale_dir: Path, codes: List[str]) -> Dict[str, List[str]]:
+    lines: Dict[str, List[str]] = {code: [] for code in codes}
+    english = set()
+    for code in codes:
+        if code == "en":
+            continue
+        seen = set()
+        for mo in sorted((locale_dir / code / "LC_MESSAGES").glob("*.mo")):
+            try:
+                with open(mo, "rb") as f:
+                    catalog = gettext.GNUTranslations(f)._catalog
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"  skipping {mo}: {e}", file=sys.stderr)
+                continue
+            for msgid, msgstr in catalog.items():
+                if isinstance(msgid, tuple):
+                    msgid = msgid[0]
+                if not msgid or msgstr == msgid:
+                    continue
+                text = clean(msgstr)
+                if len(text) > 3 and text not in seen:
+                    seen.add(text)
+                    lines[code].append(text)
+                english.add(clean(msgid))
+    if "en" in lines:
+        lines["en"] = sorted(text for text in english if len(text) > 3)
+    return lines
+
+
+def read_texts(text_dir: Path, codes: List[str]) -> Dict[str, List[str]]:
+    lines: Dict[str, List[str]] = {code: [] for code in codes}
+    for code in codes:
+        path = text_dir / f"{code}.txt"
+        if path.exists():
+            lines[code] = [l.strip() for l in path.read_text(encoding="utf-8").splitlines() if l.strip()]
+    return lines
+
+
+def split(lines: List[str]):
+    """Every tenth line held out for evaluation, the rest capped at MAX_CHARS"""
+    train, test, size = [], [], 0
+    for i, line in enumerate(lines):
+        if i % 10 == 9:
+            test.append(line)
+        elif size < MAX_CHARS:
+            train.append(line)
+            size += len(line)
+    return train, test
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--locale-dir", type=Path, help="gettext locale directory")
+    parser.add_argument("--text-dir", type=Path, help="directory of <code>.txt corpora")
+    parser.add_argument("--size", type=int, default=1500, help="trigrams kept per language")
+    parser.add_argument("--output", type=Path, default=PKG / "data" / "lang_profiles.json")
+    args = parser.parse_args()
+    if not args.locale_dir and not args.text_dir:
+        parser.error("give --locale-dir and/or --text-dir")
+
+    lid = load_language_id_module()
+    codes = [code for group in LANGUAGES.values() for code in group]
+
+    corpus: Dict[str, List[str]] = {code: [] for code in codes}
+    if args.locale_dir:
+        for code, lines in read_catalogs(args.locale_dir, codes).items():
+            corpus[code] += lines
+    if args.text_dir:
+        for code, lines in read_texts(args.text_dir, codes).items():
+            corpus[code] += lines
+
+    profiles = {}
+    held_out = {}
+    for script, group in LANGUAGES.items():
+        for code in group:
+            train, test = split(corpus[code])
+            if not train:
+                print(f"  {code}: no corpus, skipped", file=sys.stderr)
+                continue
+            trigrams: Dict[str, int] = {}
+            for line in train:
+                for gram, count in lid.scan(line)[1].items():
+                    trigrams[gram] = trigrams.get(gram, 0) + count
+            profiles[code] = {"script": script, **lid.build_profile(trigrams, args.size)}
+            held_out[code] = test
+            print(f"  {code}: {len(train)} lines, {sum(map(len, train))} chars")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "profiles": profiles}, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"Wrote {args.output} ({args.output.stat().st_size // 1024} KB)")
+
+    # Held-out accuracy, on all lines and on short ones (< 30 chars)
+    identifier = lid.LanguageIdentifier(args.output)
+    for code, test in held_out.items():
+        if not test:
+            continue
+        short = [line for line in test if len(line) < 30]
+        hits = sum(identifier.identify(line) == code for line in test)
+        short_hits = sum(identifier.identify(line) == code for line in short)
+        print(
+            f"  {code}: {hits / len(test):6.1%} of {len(test)}"
+            f"   short: {short_hits / max(len(short), 1):6.1%} of {len(short)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -64,18 +64,25 @@ cat > ~/.config/autostart/cyberdash.desktop << 'EOF'
 Type=Application
 Name=CyberDash
 Comment=Advanced Emoji Picker for Linux
-Exec=cyberdash
+Exec=cyberdash --daemon
 Icon=emoji-symbolic
 Terminal=false
 Categories=Utility;Accessories;
 StartupNotify=false
 EOF
 
+# D-Bus activation: later launches just message the resident instance
+echo "📝 Registering D-Bus service..."
+mkdir -p ~/.local/share/dbus-1/services
+sed "s|^Exec=.*|Exec=$(command -v cyberdash || echo "$HOME/.local/bin/cyberdash") --daemon|" \
+    data/com.cyberdash.app.service > ~/.local/share/dbus-1/services/com.cyberdash.app.service
+
 echo ""
 echo "✅ CyberDash installed successfully!"
 echo ""
 echo "Usage:"
-echo "  • Run 'cyberdash' to start"
+echo "  • Run 'cyberdash' to start (stays resident, later runs reuse it)"
+echo "  • Bind 'cyberdash --toggle' to a desktop shortcut if Super + . is unavailable"
 echo "  • Press Super + . to open emoji picker"
 echo "  • Configure API keys in Settings"
 echo ""
@@ -4,21 +4,32 @@ CyberDash - Emoji Picker & Tools for Linux
 GTK4 + libadwaita — Estilo Cyberpunk
 """
 
-import gi
 import sys
+
+from .utils.profiler import PROFILER
+
+# Must be enabled before the imports below so they get timed too
+if "--profile-startup" in sys.argv:
+    PROFILER.enable()
+
+import gi
 import os
 import subprocess
 import threading
 from pathlib import Path
 
-gi.require_version("Gtk", "4.0")
-gi.require_version("Adw", "1")
-gi.require_version("Gdk", "4.0")
+with PROFILER.phase("gi.require_version"):
+    gi.require_version("Gtk", "4.0")
+    gi.require_version("Adw", "1")
+    gi.require_version("Gdk", "4.0")
 
-from gi.repository import Gtk, Adw, Gdk, GLib, Gio
+with PROFILER.phase("gi.repository"):
+    from gi.repository import Gtk, Adw, Gdk, GLib, Gio
 
 from .services.hotkey_manager import HotkeyManager
 from .services.clipboard_manager import ClipboardManager
+from .services.clipboard_watcher import ClipboardWatcher
+from .services.input_injector import InputInjector
 from .services.translator_service import TranslatorService
 from .services.emoji_data import EmojiDataManager
 from .app.views.emoji_view import EmojiView
@@ -46,26 +57,38 @@ class CyberDashWindow(Adw.Window):
         self.app = app
 
         # Services
-        self.config = ConfigManager()
-        self.emoji_manager = EmojiDataManager()
-        self.clipboard_manager = ClipboardManager()
-        self.translator = TranslatorService(self.config)
+        with PROFILER.phase("services"):
+            self.config = ConfigManager()
+            self.emoji_manager = EmojiDataManager()
+            # One xdotool process shared by auto-paste and "replace in app"
+            self.injector = InputInjector()
+            self.clipboard_manager = ClipboardManager(self.config, self.injector)
+            self.translator = TranslatorService(self.config, self.injector)
 
         # Load data
-        self.emoji_manager.load()
-        self.clipboard_manager.load()
+        with PROFILER.phase("emoji_manager.load"):
+            self.emoji_manager.load()
+        with PROFILER.phase("clipboard_manager.load"):
+            self.clipboard_manager.load()
+
+        # Hotkey (X11 keybinder3)
+        with PROFILER.phase("hotkey"):
+            self.hotkey = HotkeyManager(self._toggle)
+            self.hotkey.register()
 
         # Window config
         self._setup_window()
-        self._load_css()
-        self._build_ui()
+        with PROFILER.phase("css"):
+            self._load_css()
+        with PROFILER.phase("build_ui"):
+            self._build_ui()
 
-        # Hotkey (X11 keybinder3)
-        self.hotkey = HotkeyManager(self._toggle)
-        self.hotkey.register()
+        # Copies go through the display clipboard owned by this window
+        self.clipboard_manager.attach_display_clipboard(self.get_clipboard())
 
-        # Remember the window that was focused before we opened
-        self._prev_window_id: str | None = None
+        # Record what other apps copy, too (opt-in)
+        self.clipboard_watcher = None
+        self._update_clipboard_watcher()
 
     # ── Window setup ───────────────────────────────────────────────────────
 
@@ -143,22 +166,16 @@ class CyberDashWindow(Adw.Window):
         self.stack.set_vexpand(True)
         root.append(self.stack)
 
-        # Views
-        self.emoji_view = EmojiView(self.emoji_manager, self._on_emoji_selected)
-        self.stickers_view = StickersView(self._on_item_selected)
-        self.translator_view = TranslatorView(self.translator, self.config, self._on_translate_done)
-        self.clipboard_view = ClipboardView(self.clipboard_manager, self._on_clipboard_selected)
-        self.pinned_view = PinnedView(self._on_item_selected)
-        self.settings_view = SettingsView(self.config, self._on_settings_changed)
-
-        self.pinned_view.load()
-
-        self.stack.add_named(self.emoji_view,      "emoji")
-        self.stack.add_named(self.stickers_view,   "stickers")
-        self.stack.add_named(self.translator_view, "translator")
-        self.stack.add_named(self.clipboard_view,  "clipboard")
-        self.stack.add_named(self.pinned_view,     "pinned")
-        self.stack.add_named(self.settings_view,   "settings")
+        # Views are built the first time their tab is shown
+        self._view_factories = {
+            "emoji":      lambda: EmojiView(self.emoji_manager, self._on_emoji_selected),
+            "stickers":   lambda: StickersView(self._on_item_selected),
+            "translator": lambda: TranslatorView(self.translator, self.config, self._on_translate_done),
+            "clipboard":  lambda: ClipboardView(self.clipboard_manager, self._on_clipboard_selected),
+            "pinned":     self._make_pinned_view,
+            "settings":   lambda: SettingsView(self.config, self._on_settings_changed),
+        }
+        self._views: dict[str, Gtk.Widget] = {}
 
         # Status bar
         status = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
@@ -201,12 +218,46 @@ class CyberDashWindow(Adw.Window):
         # Set initial tab
         self._switch_tab("emoji")
 
+        if self.config.get("prewarm_views", False):
+            self.prewarm_views()
+
+    # ── Lazy views ──────────────────────────────────────────────────────────
+
+    def _make_pinned_view(self) -> PinnedView:
+        view = PinnedView(self._on_item_selected)
+        view.load()
+        return view
+
+    def _get_view(self, tab_id: str) -> Gtk.Widget:
+        """Return the view for a tab, building it on first use"""
+        view = self._views.get(tab_id)
+        if view is None:
+            with PROFILER.phase(f"view:{tab_id}"):
+                view = self._view_factories[tab_id]()
+            self._views[tab_id] = view
+            self.stack.add_named(view, tab_id)
+        return view
+
+    def prewarm_views(self):
+        """Build the remaining views one per idle cycle"""
+        pending = [tab_id for tab_id, _, _ in TABS if tab_id not in self._views]
+
+        def build_next():
+            if not pending:
+                return False
+            self._get_view(pending.pop(0))
+            return True
+
+        GLib.idle_add(build_next, priority=GLib.PRIORITY_LOW)
+
     # ── Tab switching ───────────────────────────────────────────────────────
 
     def _on_tab_clicked(self, btn, tab_id: str):
         self._switch_tab(tab_id)
 
     def _switch_tab(self, tab_id: str):
+        # The clipboard view keeps itself up to date, nothing to refresh
+        self._get_view(tab_id)
         self.stack.set_visible_child_name(tab_id)
         for tid, btn in self._tab_btns.items():
             if tid == tab_id:
@@ -214,10 +265,6 @@ class CyberDashWindow(Adw.Window):
             else:
                 btn.remove_css_class("active")
 
-        # Refresh clipboard view when switching to it
-        if tab_id == "clipboard":
-            self.clipboard_view.refresh()
-
     # ── Keyboard shortcuts ──────────────────────────────────────────────────
 
     def _on_key_pressed(self, ctrl, keyval, keycode, state):
@@ -235,7 +282,7 @@ class CyberDashWindow(Adw.Window):
         # Ctrl+V in translator = paste & translate
         if (state & Gdk.ModifierType.CONTROL_MASK) and keyval == Gdk.KEY_v:
             if self.stack.get_visible_child_name() == "translator":
-                self.translator_view.paste_and_translate()
+                self._get_view("translator").paste_and_translate()
                 return True
 
         return False
@@ -246,13 +293,15 @@ class CyberDashWindow(Adw.Window):
         """Copy emoji to clipboard, optionally auto-paste"""
         success = self.clipboard_manager.copy_to_clipboard(emoji)
         self.emoji_manager.add_to_top_used(emoji)
-        self.emoji_view.refresh_top_used()
+        emoji_view = self._views.get("emoji")
+        if emoji_view:
+            emoji_view.refresh_top_used()
 
         if success:
             if self.config.get("auto_paste", True):
-                # Hide window, wait for it to lose focus, then paste
+                # Hide window; the paste waits for focus to return
                 self.hide()
-                GLib.timeout_add(150, self._auto_paste)
+                self._auto_paste()
             else:
                 self.show_toast(f"Copiado: {emoji}")
         else:
@@ -261,7 +310,6 @@ class CyberDashWindow(Adw.Window):
     def _auto_paste(self):
         """Simulate Ctrl+V in the previously active window"""
         self.clipboard_manager.paste_to_app()
-        return False  # Don't repeat
 
     def _on_item_selected(self, item: str):
         """Copy any item (sticker, ascii, pinned) to clipboard"""
@@ -269,18 +317,20 @@ class CyberDashWindow(Adw.Window):
         if success:
             if self.config.get("auto_paste", True):
                 self.hide()
-                GLib.timeout_add(150, self._auto_paste)
+                self._auto_paste()
             else:
                 self.show_toast(f"Copiado")
         else:
             self.show_toast("⚠ Instala xclip: sudo apt install xclip")
 
-    def _on_clipboard_selected(self, text: str):
-        """Re-copy a clipboard history item"""
-        self.clipboard_manager.copy_to_clipboard(text)
+    def _on_clipboard_selected(self, entry):
+        """Re-copy a clipboard history item (read back from disk if spilled)"""
+        if not self.clipboard_manager.copy_entry(entry):
+            self.show_toast("⚠ No se pudo copiar")
+            return
         if self.config.get("auto_paste", True):
             self.hide()
-            GLib.timeout_add(150, self._auto_paste)
+            self._auto_paste()
         else:
             self.show_toast("Copiado al portapapeles")
 
@@ -290,6 +340,22 @@ class CyberDashWindow(Adw.Window):
 
     def _on_settings_changed(self):
         self.translator.reload_config()
+        self._update_clipboard_watcher()
+
+    def _update_clipboard_watcher(self):
+        """Start or stop recording other applications' copies per config"""
+        wanted = self.config.get("watch_clipboard", False)
+        if wanted and self.clipboard_watcher is None:
+            self.clipboard_watcher = ClipboardWatcher(
+                self.get_clipboard(),
+                self.clipboard_manager._add_to_history,
+                self.clipboard_manager.add_content,
+                self.clipboard_manager.is_latest,
+            )
+            self.clipboard_watcher.start()
+        elif not wanted and self.clipboard_watcher is not None:
+            self.clipboard_watcher.stop()
+            self.clipboard_watcher = None
 
     # ── Toast ───────────────────────────────────────────────────────────────
 
@@ -315,6 +381,9 @@ class CyberDashWindow(Adw.Window):
             self._show_centered()
 
     def _show_centered(self):
+        if not self.is_visible():
+            # Before present(), so xdotool still sees the window we came from
+            self.injector.remember_active_window(ignore=self._xid())
         display = Gdk.Display.get_default()
         monitor = display.get_primary_monitor()
         if monitor is None:
@@ -332,6 +401,18 @@ class CyberDashWindow(Adw.Window):
 
         self.present()
 
+    def _xid(self):
+        """X11 id of this window, as xdotool prints it (None elsewhere)"""
+        try:
+            gi.require_version("GdkX11", "4.0")
+            from gi.repository import GdkX11
+        except (ValueError, ImportError):
+            return None
+        surface = self.get_surface()
+        if isinstance(surface, GdkX11.X11Surface):
+            return str(surface.get_xid())
+        return None
+
     def _on_close_request(self, window):
         """Hide instead of destroy"""
         self.hide()
@@ -339,22 +420,127 @@ class CyberDashWindow(Adw.Window):
 
     def cleanup(self):
         self.hotkey.unregister()
+        if self.clipboard_watcher:
+            self.clipboard_watcher.stop()
+        self.clipboard_manager.close()
+        self.injector.close()
+        self.translator.close()
 
 
 class CyberDashApplication(Adw.Application):
+    """
+    Single-instance application. The first process stays resident; later
+    invocations (CLI, .desktop, D-Bus) are forwarded to it by GApplication
+    and only show or toggle the existing window.
+    """
+
     def __init__(self):
         super().__init__(
             application_id="com.cyberdash.app",
-            flags=Gio.ApplicationFlags.NON_UNIQUE,
+            flags=Gio.ApplicationFlags.HANDLES_COMMAND_LINE,
         )
         self.window: CyberDashWindow | None = None
+        self._daemon = False
+
+        self.add_main_option(
+            "daemon", ord("d"), GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+            "Stay resident in the background without showing the window", None,
+        )
+        self.add_main_option(
+            "toggle", ord("t"), GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+            "Show or hide the window of the running instance", None,
+        )
+        self.add_main_option(
+            "quit", ord("q"), GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+            "Stop the running instance", None,
+        )
+        self.add_main_option(
+            "profile-startup", 0, GLib.OptionFlags.NONE, GLib.OptionArg.NONE,
+            "Print where startup time goes, up to the first frame "
+            "(with --daemon, up to the window being built)", None,
+        )
+        self.add_main_option(
+            "profile-trace", 0, GLib.OptionFlags.NONE, GLib.OptionArg.STRING,
+            "With --profile-startup, also write a Chrome trace-event JSON file", "FILE",
+        )
+
+        # Reachable without Python through org.freedesktop.Application
+        # (see cyberdash.sh): ActivateAction("show" | "toggle")
+        for name, handler in (("show", self._on_show_action), ("toggle", self._on_toggle_action)):
+            action = Gio.SimpleAction.new(name, None)
+            action.connect("activate", handler)
+            self.add_action(action)
+
         self.connect("activate", self._on_activate)
+        self.connect("command-line", self._on_command_line)
         self.connect("shutdown", self._on_shutdown)
 
-    def _on_activate(self, app):
+    def _ensure_window(self) -> CyberDashWindow:
         if self.window is None:
-            self.window = CyberDashWindow(app)
-        self.window.present()
+            self.window = CyberDashWindow(self)
+        return self.window
+
+    def _on_command_line(self, app, command_line):
+        """Runs in the primary instance, for local and remote invocations"""
+        options = command_line.get_options_dict()
+        if PROFILER.enabled and not command_line.get_is_remote():
+            trace = options.lookup_value("profile-trace", None)
+            self._profile_first_frame(
+                trace.get_string() if trace else None, options.contains("daemon")
+            )
+
+        if options.contains("quit"):
+            self.quit()
+        elif options.contains("daemon"):
+            if not self._daemon:
+                self._daemon = True
+                self.hold()
+            # Build everything now so the first hotkey only has to present()
+            self._ensure_window().prewarm_views()
+        elif options.contains("toggle"):
+            self._ensure_window()._toggle()
+        else:
+            self._ensure_window()._show_centered()
+        return 0
+
+    def _on_activate(self, app):
+        self._ensure_window()._show_centered()
+
+    def _on_show_action(self, action, param):
+        self._ensure_window()._show_centered()
+
+    def _on_toggle_action(self, action, param):
+        self._ensure_window()._toggle()
+
+    def _profile_first_frame(self, trace_path: str | None, daemon: bool = False):
+        """
+        Report the startup profile once the window draws its first frame.
+        A daemon draws nothing until the hotkey, so it reports as soon as
+        the window is built instead.
+        """
+        window = self._ensure_window()
+
+        def on_tick(widget, clock):
+            PROFILER.mark("first frame")
+            GLib.idle_add(report)
+            return GLib.SOURCE_REMOVE
+
+        def on_ready():
+            PROFILER.mark("daemon ready")
+            return report()
+
+        def report():
+            PROFILER.print_waterfall()
+            if trace_path:
+                PROFILER.write_trace(trace_path)
+                print(f"Startup trace written to {trace_path}", file=sys.stderr)
+            PROFILER.disable()
+            return False
+
+        if daemon:
+            GLib.idle_add(on_ready)
+        else:
+            window.add_tick_callback(on_tick)
 
     def _on_shutdown(self, app):
         if self.window:
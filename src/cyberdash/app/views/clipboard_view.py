@@ -2,18 +2,47 @@
 
 import gi
 gi.require_version("Gtk", "4.0")
-from gi.repository import Gtk
-from typing import Callable
+gi.require_version("Gdk", "4.0")
+from gi.repository import Gtk, Gdk, Gio, GLib, GObject
+from typing import Callable, Dict, Optional
 from ...services.clipboard_manager import ClipboardManager
+from ...services.history_store import ClipEntry, SPILL_BYTES
+from ...services.thumbnail_cache import ThumbnailCache
+
+PAGE_SIZE = 50
+
+
+MIME_LABELS = {"text/html": "HTML", "text/uri-list": "Archivos"}
+
+
+class ClipItem(GObject.Object):
+    """List model item wrapping a history entry"""
+
+    def __init__(self, entry: ClipEntry):
+        super().__init__()
+        self.entry = entry
 
 
 class ClipboardView(Gtk.Box):
-    def __init__(self, clipboard_manager: ClipboardManager, on_select: Callable[[str], None]):
+    """
+    History rendered by a recycling Gtk.ListView: only visible rows exist.
+    The Gio.ListStore behind it is filled page by page and then kept in
+    sync with ClipboardManager change events, so it is never rebuilt when
+    the tab is shown.
+    """
+
+    def __init__(self, clipboard_manager: ClipboardManager, on_select: Callable[[ClipEntry], None]):
         super().__init__(orientation=Gtk.Orientation.VERTICAL)
         self.cm = clipboard_manager
         self.on_select = on_select
+        self.thumbnails = ThumbnailCache()
+        self._search_timeout = None
+        self._offset = 0
+        self._has_more = False
+        self._items: Dict[str, ClipItem] = {}
         self._setup_ui()
         self.refresh()
+        self.cm.add_listener(self._on_history_changed)
 
     def _setup_ui(self):
         # Header
@@ -36,89 +65,223 @@ class ClipboardView(Gtk.Box):
         header.append(clear_btn)
         self.append(header)
 
-        # Scrollable list
+        # Search
+        search_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
+        search_box.add_css_class("search-box")
+
+        self.search = Gtk.Entry()
+        self.search.set_placeholder_text("🔍  Buscar en el historial...")
+        self.search.set_hexpand(True)
+        self.search.connect("changed", self._on_search_changed)
+        search_box.append(self.search)
+        self.append(search_box)
+
+        # List, or a message when there is nothing to show
+        self.content = Gtk.Stack()
+        self.content.set_vexpand(True)
+
         scroll = Gtk.ScrolledWindow()
         scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-        scroll.set_vexpand(True)
+        # Next page when scrolled to the bottom
+        scroll.connect("edge-reached", self._on_edge_reached)
 
-        self.list_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
-        self.list_box.set_spacing(0)
-        scroll.set_child(self.list_box)
-        self.append(scroll)
+        self.store = Gio.ListStore(item_type=ClipItem)
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_row_setup)
+        factory.connect("bind", self._on_row_bind)
+
+        self.list_view = Gtk.ListView(model=Gtk.NoSelection(model=self.store), factory=factory)
+        self.list_view.add_css_class("clip-list")
+        self.list_view.connect("activate", self._on_row_activate)
+        scroll.set_child(self.list_view)
+        self.content.add_named(scroll, "list")
+
+        self.empty_lbl = Gtk.Label()
+        self.empty_lbl.add_css_class("empty-label")
+        self.empty_lbl.set_justify(Gtk.Justification.CENTER)
+        self.empty_lbl.set_valign(Gtk.Align.START)
+        self.empty_lbl.set_margin_top(40)
+        self.content.add_named(self.empty_lbl, "empty")
+        self.append(self.content)
+
+    # ── Model ──────────────────────────────────────────────────────────────
 
     def refresh(self):
-        # Clear
-        while True:
-            child = self.list_box.get_first_child()
-            if child is None:
-                break
-            self.list_box.remove(child)
-
-        history = self.cm.get_history()
-        if not history:
-            lbl = Gtk.Label(label="El historial está vacío\nCopia algo para empezar")
-            lbl.add_css_class("empty-label")
-            lbl.set_justify(Gtk.Justification.CENTER)
-            lbl.set_margin_top(40)
-            self.list_box.append(lbl)
+        """Reload the first page for the current search"""
+        self.store.remove_all()
+        self._items.clear()
+        self._offset = 0
+        self._load_page()
+        self._update_empty()
+
+    def _load_page(self):
+        """Append the next page of matching entries"""
+        page = self.cm.search(self.search.get_text(), self._offset, PAGE_SIZE)
+        items = [ClipItem(entry) for entry in page if entry.key not in self._items]
+        for item in items:
+            self._items[item.entry.key] = item
+        self.store.splice(self.store.get_n_items(), 0, items)
+        self._offset += len(page)
+        self._has_more = len(page) == PAGE_SIZE
+
+    def _on_edge_reached(self, scroll, pos):
+        if pos == Gtk.PositionType.BOTTOM and self._has_more:
+            self._load_page()
+
+    def _update_empty(self):
+        if self.store.get_n_items():
+            self.content.set_visible_child_name("list")
             return
+        if self.search.get_text().strip():
+            self.empty_lbl.set_label("Sin resultados")
+        else:
+            self.empty_lbl.set_label("El historial está vacío\nCopia algo para empezar")
+        self.content.set_visible_child_name("empty")
+
+    def _on_history_changed(self, op: str, entry: Optional[ClipEntry], key: Optional[str]):
+        # Listeners may be called from the clipboard watcher thread
+        GLib.idle_add(self._apply_change, op, entry, key)
+
+    def _apply_change(self, op, entry, key):
+        if op == "add":
+            # Search results are re-run when the query changes
+            if self.search.get_text().strip():
+                return False
+            if not self._remove(entry.key):
+                self._offset += 1
+            item = ClipItem(entry)
+            self._items[entry.key] = item
+            self.store.insert(0, item)
+        elif op == "remove":
+            self._remove(key)
+        elif op == "clear":
+            self.store.remove_all()
+            self._items.clear()
+            self._offset = 0
+            self._has_more = False
+        self._update_empty()
+        return False
+
+    def _remove(self, key: str) -> bool:
+        item = self._items.pop(key, None)
+        if item is None:
+            return False
+        found, position = self.store.find(item)
+        if found:
+            self.store.remove(position)
+        return True
+
+    # ── Rows ───────────────────────────────────────────────────────────────
 
-        for text, timestamp in history[:50]:
-            self.list_box.append(self._make_row(text, timestamp))
+    def _on_row_setup(self, factory, list_item):
+        list_item.set_child(_ClipRow(self))
 
-    def _make_row(self, text: str, timestamp: str) -> Gtk.Box:
-        row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
-        row.add_css_class("clip-item")
-        row.set_spacing(6)
+    def _on_row_bind(self, factory, list_item):
+        list_item.get_child().bind(list_item.get_item().entry)
+
+    def _on_row_activate(self, list_view, position: int):
+        self.on_select(self.store.get_item(position).entry)
+
+    def _on_delete(self, key: str):
+        # The row goes away through the change event
+        self.cm.remove_item(key)
+
+    def _on_clear(self, btn):
+        self.cm.clear()
+
+    # ── Search ─────────────────────────────────────────────────────────────
+
+    def _on_search_changed(self, entry):
+        # Debounce: wait 200ms after last keystroke
+        if self._search_timeout:
+            GLib.source_remove(self._search_timeout)
+        self._search_timeout = GLib.timeout_add(200, self._do_search)
+
+    def _do_search(self):
+        self._search_timeout = None
+        self.refresh()
+        return False
+
+
+class _ClipRow(Gtk.Box):
+    """Recycled row widget; bind() points it at another entry"""
+
+    def __init__(self, view: ClipboardView):
+        super().__init__(orientation=Gtk.Orientation.HORIZONTAL)
+        self.view = view
+        self.entry: Optional[ClipEntry] = None
+        self.add_css_class("clip-item")
+        self.set_spacing(6)
+
+        # Image entries: placeholder until the thumbnail is decoded off the
+        # main thread
+        self.thumb = Gtk.Picture()
+        self.thumb.add_css_class("clip-thumb")
+        self.thumb.set_size_request(64, 48)
+        self.thumb.set_content_fit(Gtk.ContentFit.COVER)
+        self.append(self.thumb)
 
         # Text content
         info = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         info.set_hexpand(True)
         info.set_valign(Gtk.Align.CENTER)
 
-        preview = text[:120].replace("\n", " ")
-        if len(text) > 120:
-            preview += "…"
+        self.content_lbl = Gtk.Label()
+        self.content_lbl.add_css_class("clip-text")
+        self.content_lbl.set_halign(Gtk.Align.START)
+        info.append(self.content_lbl)
 
-        content_lbl = Gtk.Label(label=preview)
-        content_lbl.add_css_class("clip-text")
-        content_lbl.set_halign(Gtk.Align.START)
-        content_lbl.set_ellipsize_mode_from_string = None  # handled by preview truncation
-        info.append(content_lbl)
+        self.meta_lbl = Gtk.Label()
+        self.meta_lbl.add_css_class("clip-time")
+        self.meta_lbl.set_halign(Gtk.Align.START)
+        info.append(self.meta_lbl)
 
-        if timestamp:
-            ts_lbl = Gtk.Label(label=timestamp)
-            ts_lbl.add_css_class("clip-time")
-            ts_lbl.set_halign(Gtk.Align.START)
-            info.append(ts_lbl)
-
-        row.append(info)
+        self.append(info)
 
         # Copy button
         copy_btn = Gtk.Button(label="📋")
         copy_btn.add_css_class("clip-action-btn")
         copy_btn.set_tooltip_text("Copiar")
         copy_btn.set_valign(Gtk.Align.CENTER)
-        copy_btn.connect("clicked", self._on_copy, text)
-        row.append(copy_btn)
+        copy_btn.connect("clicked", lambda _: self.view.on_select(self.entry))
+        self.append(copy_btn)
 
         # Delete button
         del_btn = Gtk.Button(label="🗑")
         del_btn.add_css_class("clip-action-btn")
         del_btn.set_tooltip_text("Eliminar")
         del_btn.set_valign(Gtk.Align.CENTER)
-        del_btn.connect("clicked", self._on_delete, text)
-        row.append(del_btn)
+        del_btn.connect("clicked", lambda _: self.view._on_delete(self.entry.key))
+        self.append(del_btn)
 
-        return row
+    def bind(self, entry: ClipEntry):
+        self.entry = entry
+        self.content_lbl.set_label(entry.preview)
 
-    def _on_copy(self, btn, text: str):
-        self.on_select(text)
+        meta = entry.timestamp
+        if entry.mime in MIME_LABELS:
+            meta = f"{meta}  ·  {MIME_LABELS[entry.mime]}".strip(" ·")
+        if entry.size > SPILL_BYTES:
+            meta = f"{meta}  ·  {_format_size(entry.size)}".strip(" ·")
+        self.meta_lbl.set_label(meta)
+        self.meta_lbl.set_visible(bool(meta))
 
-    def _on_delete(self, btn, text: str):
-        self.cm.remove_item(text)
-        self.refresh()
+        self.thumb.set_paintable(None)
+        self.thumb.set_visible(entry.mime == "image/png")
+        if entry.mime == "image/png":
+            self.view.thumbnails.request(
+                entry.key, self.view.cm.blobs.path(entry.key), self._on_thumbnail(entry.key)
+            )
 
-    def _on_clear(self, btn):
-        self.cm.clear()
-        self.refresh()
+    def _on_thumbnail(self, key: str):
+        def set_thumbnail(pixbuf):
+            # The row may have been recycled for another entry meanwhile
+            if self.entry is not None and self.entry.key == key:
+                self.thumb.set_paintable(Gdk.Texture.new_for_pixbuf(pixbuf))
+        return set_thumbnail
+
+
+def _format_size(size: int) -> str:
+    if size < 1024 * 1024:
+        return f"{size / 1024:.0f} KB"
+    return f"{size / (1024 * 1024):.1f} MB"
@@ -3,7 +3,8 @@
 import gi
 gi.require_version("Gtk", "4.0")
 from gi.repository import Gtk, GLib
-from typing import Callable
+from difflib import SequenceMatcher
+from typing import Callable, List
 from ...services.emoji_data import EmojiDataManager, CATEGORIES
 
 
@@ -14,6 +15,7 @@ class EmojiView(Gtk.Box):
         self.on_select = on_select
         self.current_category = "recent"
         self._search_timeout = None
+        self._shown: List[str] = []
         self._setup_ui()
         self._load_category("recent")
 
@@ -86,41 +88,62 @@ class EmojiView(Gtk.Box):
         self.append(cat_scroll)
 
         # ── Emoji Grid ─────────────────────────────────
+        # Virtualized: only visible cells exist, and they are recycled
         scroll = Gtk.ScrolledWindow()
         scroll.add_css_class("emoji-grid-scroll")
         scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
         scroll.set_vexpand(True)
 
-        self.flow = Gtk.FlowBox()
-        self.flow.set_homogeneous(True)
-        self.flow.set_min_children_per_line(8)
-        self.flow.set_max_children_per_line(10)
-        self.flow.set_row_spacing(2)
-        self.flow.set_column_spacing(2)
-        self.flow.set_margin_start(4)
-        self.flow.set_margin_end(4)
-        self.flow.set_margin_top(4)
-        self.flow.set_margin_bottom(4)
-        self.flow.set_selection_mode(Gtk.SelectionMode.NONE)
-        self.flow.connect("child-activated", self._on_flow_child_activated)
-
-        scroll.set_child(self.flow)
+        self.model = Gtk.StringList()
+        factory = Gtk.SignalListItemFactory()
+        factory.connect("setup", self._on_cell_setup)
+        factory.connect("bind", self._on_cell_bind)
+
+        self.grid = Gtk.GridView(model=Gtk.NoSelection(model=self.model), factory=factory)
+        self.grid.add_css_class("emoji-grid")
+        self.grid.set_min_columns(8)
+        self.grid.set_max_columns(10)
+        self.grid.set_margin_start(4)
+        self.grid.set_margin_end(4)
+        self.grid.set_margin_top(4)
+        self.grid.set_margin_bottom(4)
+        self.grid.set_single_click_activate(True)
+        self.grid.connect("activate", self._on_grid_activate)
+
+        scroll.set_child(self.grid)
         self.append(scroll)
 
         self._update_cat_buttons("recent")
 
-    def _make_emoji_btn(self, emoji: str) -> Gtk.FlowBoxChild:
-        btn = Gtk.Button(label=emoji)
-        btn.add_css_class("emoji-btn")
-        btn.set_size_request(42, 42)
-        btn._emoji = emoji
-
-        child = Gtk.FlowBoxChild()
-        child.set_child(btn)
-        child._emoji = emoji
-
-        btn.connect("clicked", self._on_emoji_btn_clicked, emoji)
-        return child
+    def _on_cell_setup(self, factory, list_item):
+        lbl = Gtk.Label()
+        lbl.add_css_class("emoji-btn")
+        lbl.set_size_request(42, 42)
+        list_item.set_child(lbl)
+
+    def _on_cell_bind(self, factory, list_item):
+        list_item.get_child().set_label(list_item.get_item().get_string())
+
+    def _on_grid_activate(self, grid, position: int):
+        emoji = self.model.get_string(position)
+        if emoji:
+            self.on_select(emoji)
+
+    def _set_emojis(self, emojis: List[str], diff: bool = False):
+        """
+        Show emojis in the grid. With diff, only the inserted/removed runs
+        are spliced into the model, so cells that stay are not rebound.
+        """
+        emojis = list(emojis)
+        if not diff:
+            self.model.splice(0, self.model.get_n_items(), emojis)
+        else:
+            ops = SequenceMatcher(None, self._shown, emojis, autojunk=False).get_opcodes()
+            # Back to front, so earlier positions stay valid
+            for tag, i1, i2, j1, j2 in reversed(ops):
+                if tag != "equal":
+                    self.model.splice(i1, i2 - i1, emojis[j1:j2])
+        self._shown = emojis
 
     def _on_emoji_btn_clicked(self, btn, emoji: str):
         self.on_select(emoji)
@@ -137,10 +160,7 @@ class EmojiView(Gtk.Box):
             flow.remove(child)
 
     def _load_category(self, category: str):
-        self._clear_flow(self.flow)
-        emojis = self.emoji_manager.get_category_emojis(category)
-        for emoji in emojis:
-            self.flow.append(self._make_emoji_btn(emoji))
+        self._set_emojis(self.emoji_manager.get_category_emojis(category))
         self._load_top_used()
 
     def _load_top_used(self):
@@ -187,10 +207,7 @@ class EmojiView(Gtk.Box):
         if not query:
             self._load_category(self.current_category)
             return
-        results = self.emoji_manager.search(query)
-        self._clear_flow(self.flow)
-        for emoji in results:
-            self.flow.append(self._make_emoji_btn(emoji))
+        self._set_emojis(self.emoji_manager.search_ranked(query), diff=True)
 
     def refresh_top_used(self):
         self._load_top_used()
@@ -48,6 +48,20 @@ class SettingsView(Gtk.Box):
         lang_group.append(lang_combo)
         box.append(lang_group)
 
+        # ── Clipboard ─────────────────────────────────
+        clip_group = self._make_group(
+            "HISTORIAL DEL PORTAPAPELES",
+            "Guardar también lo que se copia en otras aplicaciones "
+            "(se omite lo que los gestores de contraseñas marcan como secreto)",
+            []
+        )
+        watch_switch = Gtk.Switch()
+        watch_switch.set_halign(Gtk.Align.START)
+        watch_switch.set_active(self.config.get("watch_clipboard", False))
+        watch_switch.connect("notify::active", self._on_watch_toggled)
+        clip_group.append(watch_switch)
+        box.append(clip_group)
+
         # ── API Keys ──────────────────────────────────
         api_keys = self.config.get("api_keys", {})
 
@@ -59,8 +73,8 @@ class SettingsView(Gtk.Box):
 
         box.append(self._make_group(
             "OLLAMA URL",
-            "URL local de Ollama (defecto: localhost:11434)",
-            [("URL", "_ollama_url", api_keys.get("ollama_url", "http://localhost:11434"), False)]
+            "URL local de Ollama (vacía: localhost:11434)",
+            [("http://localhost:11434", "_ollama_url", api_keys.get("ollama_url", ""), False)]
         ))
 
         box.append(self._make_group(
@@ -138,6 +152,11 @@ class SettingsView(Gtk.Box):
 
         return group
 
+    def _on_watch_toggled(self, switch, _pspec):
+        self.config.set("watch_clipboard", switch.get_active())
+        if self.on_changed:
+            self.on_changed()
+
     def _on_save(self, btn):
         api_keys = self.config.get("api_keys", {})
 
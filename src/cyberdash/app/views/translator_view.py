@@ -4,9 +4,23 @@ import gi
 gi.require_version("Gtk", "4.0")
 gi.require_version("Gdk", "4.0")
 from gi.repository import Gtk, Gdk, GLib
-import threading
-from typing import Callable
-from ...services.translator_service import TranslatorService, LANGUAGES
+from typing import Callable, List, Optional
+from ...services.translator_service import (
+    TranslatorService, LANGUAGES, STREAMING_PROVIDERS, split_sentences,
+)
+
+# Live mode waits for a typing pause about as long as a translation takes,
+# within these bounds (ms); rate-limited providers wait longer
+LIVE_MIN_DELAY = 300
+LIVE_MAX_DELAY = 2000
+LIVE_PROVIDER_MIN_DELAY = {"mymemory": 1000}
+
+PROVIDER_NAMES = {
+    "mymemory": "MyMemory (gratuito)",
+    "libretranslate": "LibreTranslate",
+    "openai": "OpenAI GPT",
+    "ollama": "Ollama local",
+}
 
 
 class TranslatorView(Gtk.Box):
@@ -15,6 +29,14 @@ class TranslatorView(Gtk.Box):
         self.translator = translator
         self.config = config
         self.on_done = on_done
+        # Latest streamed text, written by the translator worker and shown
+        # by a tick callback at most once per frame
+        self._partial: Optional[str] = None
+        self._tick_id = 0
+        self._live_timeout = 0
+        # Sentences of the input being translated live, for reassembly
+        self._live_pieces: List[str] = []
+        self._live_explicit = False
         self._setup_ui()
 
     def _setup_ui(self):
@@ -31,20 +53,27 @@ class TranslatorView(Gtk.Box):
         prov_lbl.add_css_class("provider-label")
 
         self.provider_combo = Gtk.ComboBoxText()
-        providers = [
-            ("mymemory", "MyMemory (gratuito)"),
-            ("libretranslate", "LibreTranslate"),
-            ("openai", "OpenAI GPT"),
-            ("ollama", "Ollama local"),
-        ]
-        for pid, pname in providers:
+        for pid, pname in PROVIDER_NAMES.items():
             self.provider_combo.append(pid, pname)
         cur = self.config.get("translator_provider", "mymemory")
         self.provider_combo.set_active_id(cur)
         self.provider_combo.connect("changed", self._on_provider_changed)
 
+        live_lbl = Gtk.Label(label="En vivo")
+        live_lbl.add_css_class("provider-label")
+        live_lbl.set_hexpand(True)
+        live_lbl.set_halign(Gtk.Align.END)
+
+        self.live_switch = Gtk.Switch()
+        self.live_switch.set_valign(Gtk.Align.CENTER)
+        self.live_switch.set_tooltip_text("Traducir mientras escribes")
+        self.live_switch.set_active(self.config.get("live_translate", False))
+        self.live_switch.connect("notify::active", self._on_live_toggled)
+
         prov_row.append(prov_lbl)
         prov_row.append(self.provider_combo)
+        prov_row.append(live_lbl)
+        prov_row.append(self.live_switch)
         box.append(prov_row)
 
         # Language row
@@ -57,6 +86,7 @@ class TranslatorView(Gtk.Box):
                 self.src_combo.append(code, name)
         self.src_combo.set_active_id("auto")
         self.src_combo.set_hexpand(True)
+        self.src_combo.connect("changed", self._schedule_live)
         lang_row.append(self.src_combo)
 
         swap_btn = Gtk.Button(label="⇄")
@@ -71,6 +101,7 @@ class TranslatorView(Gtk.Box):
         tgt = self.config.get("target_language", "es")
         self.tgt_combo.set_active_id(tgt)
         self.tgt_combo.set_hexpand(True)
+        self.tgt_combo.connect("changed", self._schedule_live)
         lang_row.append(self.tgt_combo)
 
         box.append(lang_row)
@@ -84,6 +115,7 @@ class TranslatorView(Gtk.Box):
         self.input_view.set_top_margin(6)
         self.input_view.set_left_margin(8)
         self.input_view.set_right_margin(8)
+        self.input_view.get_buffer().connect("changed", self._schedule_live)
         in_frame.set_child(self.input_view)
         box.append(in_frame)
 
@@ -147,6 +179,7 @@ class TranslatorView(Gtk.Box):
 
     def _on_provider_changed(self, combo):
         self.translator.set_provider(combo.get_active_id())
+        self._schedule_live()
 
     def _swap_langs(self, btn):
         src = self.src_combo.get_active_id()
@@ -182,51 +215,153 @@ class TranslatorView(Gtk.Box):
             self.status_lbl.set_label(f"Error pegando: {e}")
 
     def _on_translate(self, btn):
+        if self.live_switch.get_active():
+            # Translate now instead of after the pause
+            self._cancel_live_timeout()
+            self._run_live(explicit=True)
+            return
         text = self._get_input_text().strip()
         if not text:
             return
         src = self.src_combo.get_active_id() or "auto"
         tgt = self.tgt_combo.get_active_id() or "es"
-        self.config.set("target_language", tgt)
+        self._save_target(tgt)
         self.status_lbl.set_label("⟳  Traduciendo...")
-
-        def do_translate():
-            try:
-                result, detected = self.translator.translate(text, src, tgt)
-                GLib.idle_add(self._on_translate_done, result, detected, None)
-            except Exception as e:
-                GLib.idle_add(self._on_translate_done, None, None, str(e))
-
-        threading.Thread(target=do_translate, daemon=True).start()
-
-    def _on_translate_done(self, result, detected, error):
+        self._partial = None
+        if self.translator.provider in STREAMING_PROVIDERS and not self._tick_id:
+            self._tick_id = self.output_view.add_tick_callback(self._on_tick)
+        # Supersedes any translation still in flight from this view
+        self.translator.translate_async(
+            text, src, tgt, self._on_translate_done, channel="view", on_partial=self._on_partial
+        )
+
+    def _save_target(self, tgt: str):
+        # config.set() rewrites the file, so only when it actually changed
+        if self.config.get("target_language") != tgt:
+            self.config.set("target_language", tgt)
+
+    def _on_partial(self, text: str):
+        # Worker thread: only store it, drawing happens on the next frame
+        self._partial = text
+
+    def _on_tick(self, widget, clock):
+        partial, self._partial = self._partial, None
+        if partial is not None:
+            self._set_output_text(partial)
+        return GLib.SOURCE_CONTINUE
+
+    def _stop_streaming(self):
+        if self._tick_id:
+            self.output_view.remove_tick_callback(self._tick_id)
+            self._tick_id = 0
+        self._partial = None
+
+    def _on_translate_done(self, result, detected, error, provider):
+        self._stop_streaming()
         if error:
             self.status_lbl.set_label(f"✗  {error}")
         else:
             self._set_output_text(result)
             lang_name = LANGUAGES.get(detected, detected)
             self.detected_lbl.set_label(f"Detectado: {lang_name}")
-            self.status_lbl.set_label("✓  Traducción completada")
+            self._show_done(provider)
             if self.on_done:
                 self.on_done(self._get_input_text(), result)
 
+    # ── Live mode ──────────────────────────────────────────────────────────
+
+    def _on_live_toggled(self, switch, pspec):
+        self.config.set("live_translate", switch.get_active())
+        if switch.get_active():
+            self._schedule_live()
+        else:
+            self._cancel_live_timeout()
+            self.translator.cancel("live")
+
+    def _schedule_live(self, *args):
+        if not self.live_switch.get_active():
+            return
+        # Whatever is in flight is for outdated text
+        self.translator.cancel("live")
+        self.translator.cancel("view")
+        self._stop_streaming()
+        self._cancel_live_timeout()
+        # Slow providers get a longer pause, so fewer requests pile up
+        provider = self.translator.provider
+        delay = int(self.translator.expected_latency(provider) * 1000)
+        low = max(LIVE_MIN_DELAY, LIVE_PROVIDER_MIN_DELAY.get(provider, 0))
+        delay = min(max(delay, low), LIVE_MAX_DELAY)
+        self._live_timeout = GLib.timeout_add(delay, self._on_live_timeout)
+
+    def _cancel_live_timeout(self):
+        if self._live_timeout:
+            GLib.source_remove(self._live_timeout)
+            self._live_timeout = 0
+
+    def _on_live_timeout(self):
+        self._live_timeout = 0
+        self._run_live()
+        return False
+
+    def _run_live(self, explicit: bool = False):
+        # Only an explicit translation (button, paste) goes to the history
+        self._live_explicit = explicit
+        text = self._get_input_text()
+        if not text.strip():
+            self._set_output_text("")
+            return
+        src = self.src_combo.get_active_id() or "auto"
+        tgt = self.tgt_combo.get_active_id() or "es"
+        self._save_target(tgt)
+        # Sentence by sentence: unchanged ones are translation cache hits,
+        # only edited ones reach the provider
+        self._live_pieces = split_sentences(text)
+        self.status_lbl.set_label("⟳  Traduciendo...")
+        self.translator.translate_many_async(
+            [piece.strip() for piece in self._live_pieces],
+            src,
+            tgt,
+            self._on_live_done,
+            channel="live",
+        )
+
+    def _on_live_done(self, results, detected, error, provider):
+        if error:
+            self.status_lbl.set_label(f"✗  {error}")
+            return
+        # Keep the input's spacing and line breaks around each sentence
+        parts = []
+        for piece, result in zip(self._live_pieces, results):
+            stripped = piece.strip()
+            if not stripped:
+                parts.append(piece)
+                continue
+            start = piece.index(stripped)
+            parts.append(piece[:start] + result + piece[start + len(stripped):])
+        self._set_output_text("".join(parts))
+        self.detected_lbl.set_label(f"Detectado: {LANGUAGES.get(detected, detected)}")
+        self._show_done(provider)
+        if self._live_explicit and self.on_done:
+            self.on_done(self._get_input_text(), self._get_output_text())
+
+    def _show_done(self, provider: Optional[str]):
+        # Failover may have answered from another provider than the chosen one
+        if provider is None:
+            self.status_lbl.set_label("✓  Traducción completada")
+        else:
+            name = PROVIDER_NAMES.get(provider, provider)
+            self.status_lbl.set_label(f"✓  Traducción completada · {name}")
+
     def _copy_output(self, btn):
         text = self._get_output_text()
         if not text:
             return
-        # GTK4 clipboard write
-        clipboard = Gdk.Display.get_default().get_clipboard()
-        # Use subprocess as reliable fallback
-        import subprocess
-        try:
-            subprocess.run(["xclip", "-selection", "clipboard"], input=text.encode(), check=True)
+        # GTK4 clipboard write, in-process
+        provider = Gdk.ContentProvider.new_for_value(text)
+        if self.get_clipboard().set_content(provider):
             self.status_lbl.set_label("✓  Copiado al portapapeles")
-        except Exception:
-            try:
-                subprocess.run(["xsel", "--clipboard", "--input"], input=text.encode(), check=True)
-                self.status_lbl.set_label("✓  Copiado al portapapeles")
-            except Exception as e:
-                self.status_lbl.set_label(f"✗  {e}")
+        else:
+            self.status_lbl.set_label("✗  No se pudo copiar")
 
     def _replace_in_app(self, btn):
         text = self._get_output_text()
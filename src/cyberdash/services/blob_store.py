@@ -0,0 +1,56 @@
+"""Blob Store - content-addressed payload files for large clipboard entries"""
+
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+class BlobStore:
+    """
+    One file per payload, named by its content hash, so storing the same
+    content twice is free. Writes go to a temp file and are renamed into
+    place; a missing or partial blob reads as None.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def path(self, key: str) -> Path:
+        # Two-level fan-out keeps directories small
+        return self.root / key[:2] / key
+
+    def put(self, key: str, data: bytes):
+        path = self.path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self.path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def delete(self, key: str):
+        try:
+            self.path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def retain(self, keys: Iterable[str]):
+        """Delete every blob whose key is not in keys"""
+        if not self.root.exists():
+            return
+        keep = set(keys)
+        for path in self.root.glob("*/*"):
+            if path.name not in keep:
+                path.unlink(missing_ok=True)
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
@@ -1,132 +1,272 @@
 """Clipboard Manager - GTK4 compatible, X11 focused"""
 
-import json
 import subprocess
 import threading
+from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Callable, List, Optional
+
+from .blob_store import BlobStore
+from .history_store import (
+    ClipEntry,
+    HistoryStore,
+    JournalStore,
+    SqliteStore,
+    content_hash,
+    data_hash,
+    html_to_text,
+    rich_preview,
+)
+from .input_injector import InputInjector
 
 
 class ClipboardManager:
     """Manages clipboard with persistent history"""
 
-    def __init__(self):
+    def __init__(self, config=None, injector: Optional[InputInjector] = None):
         self.config_dir = Path.home() / ".config" / "cyberdash"
+        # Legacy full-rewrite history, imported once into the journal
         self.history_file = self.config_dir / "clipboard_history.json"
-        # List of (text, timestamp) tuples
-        self.history: List[Tuple[str, str]] = []
-        self.max_history = 50
+        self.journal_file = self.config_dir / "clipboard_history.log"
+        self.db_file = self.config_dir / "clipboard_history.db"
+        # Payloads over SPILL_BYTES, read back only when re-copied
+        self.blobs = BlobStore(self.config_dir / "clipboard_blobs")
+        # Newest entries by content hash, newest last; with the sqlite
+        # backend older ones stay on disk until searched
+        self._entries: "OrderedDict[str, ClipEntry]" = OrderedDict()
+        self.max_history = config.get("max_clipboard", 50) if config else 50
         self._lock = threading.Lock()
+        self._store = self._make_store(config)
+        self._listeners: List[Callable] = []
+        self._gdk_clipboard = None
+        # "gdk" or one of COPY_COMMANDS, detected on first copy
+        self._backend = None
+        self.injector = injector or InputInjector()
+
+    def _make_store(self, config) -> HistoryStore:
+        backend = config.get("clipboard_backend", "journal") if config else "journal"
+        if backend == "sqlite":
+            capacity = config.get("clipboard_capacity", 50000)
+            return SqliteStore(self.db_file, self.blobs, self.max_history, capacity)
+        return JournalStore(self.journal_file, self.blobs, self.get_history, self.max_history)
 
     def load(self):
-        """Load history from disk"""
-        if self.history_file.exists():
+        """Load the newest entries from disk"""
+        # The sqlite backend imports the journal on first use
+        legacy = self.journal_file if self._store.searchable else self.history_file
+        try:
+            history = self._store.load(legacy_file=legacy)
+        except Exception as e:
+            print(f"Clipboard load error: {e}")
+            history = []
+        with self._lock:
+            self._entries = OrderedDict(
+                (entry.key, entry) for entry in reversed(history[: self.max_history])
+            )
+
+    def close(self):
+        """Flush pending history writes"""
+        self._store.close()
+
+    def add_listener(self, callback: Callable[[str, Optional[ClipEntry], Optional[str]], None]):
+        """
+        callback(op, entry, key) after every history change: ("add", entry,
+        None) for a new or re-copied entry (now newest), ("remove", None,
+        key) and ("clear", None, None). May be called from any thread.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, op: str, entry: Optional[ClipEntry] = None, key: Optional[str] = None):
+        for callback in self._listeners:
             try:
-                with open(self.history_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    raw = data.get("history", [])
-                    # Support both old (str) and new (list) formats
-                    self.history = []
-                    for item in raw:
-                        if isinstance(item, list) and len(item) == 2:
-                            self.history.append((item[0], item[1]))
-                        elif isinstance(item, str):
-                            self.history.append((item, ""))
-                    self.history = self.history[: self.max_history]
+                callback(op, entry, key)
             except Exception as e:
-                print(f"Clipboard load error: {e}")
-                self.history = []
+                print(f"Clipboard listener error: {e}")
 
-    def _save(self):
-        """Save history to disk"""
-        self.config_dir.mkdir(parents=True, exist_ok=True)
-        try:
-            with open(self.history_file, "w", encoding="utf-8") as f:
-                json.dump(
-                    {"history": [[t, ts] for t, ts in self.history]},
-                    f,
-                    ensure_ascii=False,
-                    indent=2,
-                )
-        except Exception as e:
-            print(f"Clipboard save error: {e}")
+    # ── Clipboard backends ─────────────────────────────────────────────────
+
+    # External tools, tried in order when no display clipboard is attached
+    COPY_COMMANDS = [
+        ["xclip", "-selection", "clipboard"],  # most reliable on X11
+        ["xsel", "--clipboard", "--input"],
+        ["wl-copy"],  # Wayland fallback
+    ]
+    # Same for non-text payloads; {mime} is filled in
+    COPY_TYPED_COMMANDS = [
+        ["xclip", "-selection", "clipboard", "-t", "{mime}"],
+        ["wl-copy", "--type", "{mime}"],
+    ]
+
+    def attach_display_clipboard(self, clipboard):
+        """
+        Use a Gdk.Clipboard (owned by the long-lived window) for copies.
+        Setting it is an in-process call, no fork per copy.
+        """
+        self._gdk_clipboard = clipboard
+        self._backend = None
 
     def copy_to_clipboard(self, text: str) -> bool:
-        """Copy text to X11 clipboard using xclip. Returns True on success."""
+        """Copy text to the system clipboard. Returns True on success."""
         if not text:
             return False
 
-        # Try xclip (most reliable on X11)
-        for cmd in [
-            ["xclip", "-selection", "clipboard"],
-            ["xsel", "--clipboard", "--input"],
-            ["wl-copy"],  # Wayland fallback
-        ]:
-            try:
-                proc = subprocess.run(
-                    cmd,
-                    input=text.encode("utf-8"),
-                    capture_output=True,
-                    timeout=2,
-                )
-                if proc.returncode == 0:
-                    self._add_to_history(text)
-                    return True
-            except (FileNotFoundError, subprocess.TimeoutExpired):
-                continue
-            except Exception as e:
-                print(f"Clipboard error with {cmd[0]}: {e}")
+        # The backend that worked last time is tried first and only
+        # re-detected when it fails
+        if self._backend is not None and self._copy_with(self._backend, text):
+            self._add_to_history(text)
+            return True
+
+        backends = (["gdk"] if self._gdk_clipboard is not None else []) + self.COPY_COMMANDS
+        for backend in backends:
+            if backend != self._backend and self._copy_with(backend, text):
+                self._backend = backend
+                self._add_to_history(text)
+                return True
 
+        self._backend = None
         print("Warning: No clipboard tool found (install xclip)")
         return False
 
-    def paste_to_app(self) -> bool:
-        """Simulate Ctrl+V in the previously focused window using xdotool"""
+    def _copy_with(self, backend, text: str) -> bool:
+        if backend == "gdk":
+            try:
+                from gi.repository import Gdk
+                return self._gdk_clipboard.set_content(Gdk.ContentProvider.new_for_value(text))
+            except Exception as e:
+                print(f"Clipboard error with Gdk: {e}")
+                return False
+        return self._pipe_to(backend, text.encode("utf-8"))
+
+    def _pipe_to(self, cmd: List[str], data: bytes) -> bool:
         try:
-            subprocess.run(
-                ["xdotool", "key", "--clearmodifiers", "ctrl+v"],
-                timeout=2,
-                capture_output=True,
-            )
-            return True
+            proc = subprocess.run(cmd, input=data, capture_output=True, timeout=2)
+            return proc.returncode == 0
         except (FileNotFoundError, subprocess.TimeoutExpired):
             return False
+        except Exception as e:
+            print(f"Clipboard error with {cmd[0]}: {e}")
+            return False
+
+    def copy_entry(self, entry: ClipEntry) -> bool:
+        """Re-copy a history entry in its original format"""
+        if entry.mime == "text/plain":
+            text = self.get_text(entry.key)
+            return text is not None and self.copy_to_clipboard(text)
+
+        data = self.blobs.get(entry.key)
+        if data is None or not self._copy_data(entry.mime, data):
+            return False
+        entry.timestamp = datetime.now().strftime("%H:%M")
+        self._add_entry(entry, data)
+        return True
+
+    def _copy_data(self, mime: str, data: bytes) -> bool:
+        if self._gdk_clipboard is not None:
+            try:
+                from gi.repository import Gdk, GLib
+                providers = [Gdk.ContentProvider.new_for_bytes(mime, GLib.Bytes.new(data))]
+                # Plain-text alternative for apps that only paste text
+                if mime != "image/png":
+                    text = data.decode("utf-8", errors="replace")
+                    if mime == "text/html":
+                        text = html_to_text(text)
+                    providers.append(Gdk.ContentProvider.new_for_value(text))
+                provider = Gdk.ContentProvider.new_union(providers)
+                if self._gdk_clipboard.set_content(provider):
+                    return True
+            except Exception as e:
+                print(f"Clipboard error with Gdk: {e}")
+        for cmd in self.COPY_TYPED_COMMANDS:
+            if self._pipe_to([arg.format(mime=mime) for arg in cmd], data):
+                return True
+        return False
+
+    def paste_to_app(self) -> bool:
+        """Ctrl+V in the previously focused window, as soon as it has focus again"""
+        return self.injector.paste()
 
     def type_text(self, text: str) -> bool:
         """Type text directly into the previously focused window"""
-        try:
-            subprocess.run(
-                ["xdotool", "type", "--clearmodifiers", "--", text],
-                timeout=5,
-                capture_output=True,
-            )
-            return True
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            return False
+        return self.injector.type_text(text)
 
     def _add_to_history(self, text: str):
-        """Add text to history (deduplicates, newest first)"""
+        """Add text to history (deduplicates by content hash, newest first)"""
+        ts = datetime.now().strftime("%H:%M")
+        self._add_entry(ClipEntry.from_text(content_hash(text), text, ts), text)
+
+    def add_content(self, mime: str, data: bytes):
+        """Add a non-text payload (image/png, text/html, text/uri-list)"""
+        ts = datetime.now().strftime("%H:%M")
+        entry = ClipEntry(data_hash(mime, data), ts, rich_preview(mime, data), len(data), mime=mime)
+        self._add_entry(entry, data)
+
+    def _add_entry(self, entry: ClipEntry, payload):
+        evicted = None
+        with self._lock:
+            known = self._entries.get(entry.key)
+            if known is not None:
+                # Known entry: only re-stamped, its payload is not written again
+                known.timestamp = entry.timestamp
+                self._entries.move_to_end(entry.key)
+                self._store.add(known)
+                entry = known
+            else:
+                self._entries[entry.key] = entry
+                if len(self._entries) > self.max_history:
+                    evicted, _ = self._entries.popitem(last=False)
+                self._store.add(entry, payload)
+        self._notify("add", entry)
+        # Entries past the window stay listed when the store keeps them
+        if evicted is not None and not self._store.searchable:
+            self._notify("remove", key=evicted)
+
+    def is_latest(self, key: str) -> bool:
+        """Whether key is the newest entry of the history"""
+        with self._lock:
+            return bool(self._entries) and next(reversed(self._entries)) == key
+
+    def get_history(self) -> List[ClipEntry]:
+        """Entries held in memory, newest first"""
         with self._lock:
-            # Remove if duplicate
-            self.history = [(t, ts) for t, ts in self.history if t != text]
-            # Add to front
-            ts = datetime.now().strftime("%H:%M")
-            self.history.insert(0, (text, ts))
-            self.history = self.history[: self.max_history]
-            self._save()
-
-    def get_history(self) -> List[Tuple[str, str]]:
-        """Get list of (text, timestamp) tuples"""
+            return list(reversed(self._entries.values()))
+
+    def get_text(self, key: str) -> Optional[str]:
+        """Full text of an entry, read from disk if it was spilled"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry.text is not None:
+            return entry.text
+        data = self.blobs.get(key)
+        if data is not None:
+            return data.decode("utf-8")
+        return self._store.get_text(key)
+
+    def search(self, query: str = "", offset: int = 0, limit: int = 50) -> List[ClipEntry]:
+        """Page of entries containing query, newest first"""
+        query = query.strip()
+        with self._lock:
+            window = len(self._entries)
+        if self._store.searchable and (query or offset + limit > window):
+            try:
+                return self._store.search(query, offset, limit)
+            except Exception as e:
+                print(f"Clipboard search error: {e}")
         with self._lock:
-            return list(self.history)
+            items = list(reversed(self._entries.values()))
+            if query:
+                needle = query.casefold()
+                items = [e for e in items if needle in (e.text or e.preview).casefold()]
+            return items[offset : offset + limit]
 
-    def remove_item(self, text: str):
+    def remove_item(self, key: str):
         with self._lock:
-            self.history = [(t, ts) for t, ts in self.history if t != text]
-            self._save()
+            self._entries.pop(key, None)
+            self._store.remove(key)
+        self._notify("remove", key=key)
 
     def clear(self):
         with self._lock:
-            self.history = []
-            self._save()
+            self._entries.clear()
+            self._store.clear()
+        self._notify("clear")
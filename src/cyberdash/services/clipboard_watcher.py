@@ -0,0 +1,158 @@
+"""Clipboard Watcher - records copies made in other applications"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import gi
+gi.require_version("Gdk", "4.0")
+from gi.repository import Gdk, Gio, GLib
+
+from .history_store import content_hash, data_hash
+
+
+class ClipboardWatcher:
+    """
+    Listens to Gdk.Clipboard "changed" (XFixes selection events on X11,
+    the data-control/selection protocol on Wayland): no polling, nothing
+    runs while the clipboard is idle. Bursts of changes are coalesced into
+    one read, content already at the top of the history is skipped, and the
+    history is updated on a worker thread. Copies flagged as sensitive by
+    password managers are never read. Images and URI lists are read as raw
+    bytes and handed to on_data, as is HTML when no plain text comes with
+    it; anything else is read as text. Raw reads stop at MAX_BYTES.
+    """
+
+    SETTLE_MS = 150
+    # Set by password managers on secrets: KDE's hint (KeePassXC, KWallet…)
+    # and the nspasteboard.org markers (concealed / not for history)
+    SECRET_MIMES = [
+        "x-kde-passwordManagerHint",
+        "application/x-kde-passwordManagerHint",
+        "org.nspasteboard.ConcealedType",
+        "org.nspasteboard.TransientType",
+    ]
+    # Preferred over plain text when offered, most specific first
+    RICH_MIMES = ["image/png", "text/uri-list"]
+    # Plain text as offered by GTK, Qt and X11 clients
+    TEXT_MIMES = ["text/plain;charset=utf-8", "text/plain", "UTF8_STRING", "STRING", "TEXT"]
+    # Recorded only when no plain text is offered
+    FALLBACK_MIMES = ["text/html"]
+    MAX_BYTES = 32 * 1024 * 1024
+    CHUNK_BYTES = 256 * 1024
+
+    def __init__(
+        self,
+        clipboard: Gdk.Clipboard,
+        on_text: Callable[[str], None],
+        on_data: Callable[[str, bytes], None],
+        is_latest: Callable[[str], bool],
+    ):
+        self.clipboard = clipboard
+        self.on_text = on_text
+        self.on_data = on_data
+        self.is_latest = is_latest
+        self._handler = 0
+        self._timeout = 0
+        self._serial = 0
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clipboard-watch")
+
+    def start(self):
+        if not self._handler:
+            self._handler = self.clipboard.connect("changed", self._on_changed)
+
+    def stop(self):
+        if self._handler:
+            self.clipboard.disconnect(self._handler)
+            self._handler = 0
+        if self._timeout:
+            GLib.source_remove(self._timeout)
+            self._timeout = 0
+        # Reads still in flight find themselves stale and drop their result
+        self._serial += 1
+        self._worker.shutdown(wait=True)
+
+    def _on_changed(self, clipboard):
+        # Our own copies are already in the history
+        if clipboard.is_local():
+            return
+        if self._timeout:
+            GLib.source_remove(self._timeout)
+        self._timeout = GLib.timeout_add(self.SETTLE_MS, self._read)
+
+    def _read(self):
+        self._timeout = 0
+        formats = self.clipboard.get_formats()
+        if any(formats.contain_mime_type(mime) for mime in self.SECRET_MIMES):
+            return False
+        self._serial += 1
+        has_text = any(formats.contain_mime_type(mime) for mime in self.TEXT_MIMES)
+        for mime in self.RICH_MIMES + ([] if has_text else self.FALLBACK_MIMES):
+            if formats.contain_mime_type(mime):
+                self.clipboard.read_async(
+                    [mime], GLib.PRIORITY_DEFAULT, None, self._on_stream, self._serial
+                )
+                return False
+        self.clipboard.read_text_async(None, self._on_text_read, self._serial)
+        return False
+
+    def _on_stream(self, clipboard, result, serial):
+        try:
+            stream, mime = clipboard.read_finish(result)
+        except GLib.Error:
+            return
+        if serial != self._serial:
+            stream.close(None)
+            return
+        # Read into memory chunk by chunk asynchronously, the main loop stays
+        # free and an oversized payload is dropped as soon as it passes the cap
+        self._read_chunk(stream, {"serial": serial, "mime": mime, "chunks": [], "size": 0})
+
+    def _read_chunk(self, stream: Gio.InputStream, state: dict):
+        stream.read_bytes_async(
+            self.CHUNK_BYTES, GLib.PRIORITY_DEFAULT, None, self._on_chunk, state
+        )
+
+    def _on_chunk(self, stream, result, state):
+        try:
+            chunk = stream.read_bytes_finish(result)
+        except GLib.Error:
+            stream.close(None)
+            return
+        size = chunk.get_size()
+        state["size"] += size
+        if state["serial"] != self._serial or state["size"] > self.MAX_BYTES:
+            stream.close(None)
+            return
+        if size:
+            state["chunks"].append(chunk.get_data())
+            self._read_chunk(stream, state)
+            return
+        stream.close(None)
+        if state["size"]:
+            self._worker.submit(self._record_data, state["mime"], b"".join(state["chunks"]))
+
+    def _on_text_read(self, clipboard, result, serial):
+        try:
+            text = clipboard.read_text_finish(result)
+        except GLib.Error:
+            return  # not text, or the owner went away
+        # A newer change superseded this read
+        if serial != self._serial or not text or not text.strip():
+            return
+        self._worker.submit(self._record, text)
+
+    def _record(self, text: str):
+        if self.is_latest(content_hash(text)):
+            return
+        try:
+            self.on_text(text)
+        except Exception as e:
+            print(f"Clipboard watcher error: {e}")
+
+    def _record_data(self, mime: str, data: bytes):
+        if self.is_latest(data_hash(mime, data)):
+            return
+        try:
+            self.on_data(mime, data)
+        except Exception as e:
+            print(f"Clipboard watcher error: {e}")
@@ -1,8 +1,22 @@
 """Emoji Data Manager - categories, search, top-used"""
 
+import hashlib
 import json
+import os
+import threading
+import time
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
+
+from .emoji_index import (
+    FORMAT_VERSION, RANK_BUDGET_S, BaseEmojiIndex, EmojiIndex, MappedEmojiIndex,
+    normalize_term, write_index_file,
+)
+
+# Full CLDR dataset, generated by scripts/build_emoji_data.py (optional)
+DATA_FILE = Path(__file__).parent.parent / "data" / "emoji.bin"
+# Without it, the built-in set is indexed once and mapped from here on
+CACHE_DIR = Path.home() / ".cache" / "cyberdash"
 
 
 CATEGORIES = {
@@ -167,9 +181,49 @@ class EmojiDataManager:
         self.config_dir = Path.home() / ".config" / "cyberdash"
         self.top_used_file = self.config_dir / "top_used.json"
         self.top_used: List[str] = []
+        # emoji -> times picked, used to rank search results
+        self.usage: Dict[str, int] = {}
+        # The same counts by emoji id of the current index, built on demand
+        self._usage_ids: Optional[Dict[int, int]] = None
+        self._index: BaseEmojiIndex = EmojiIndex()
+        self._mapped: Optional[MappedEmojiIndex] = None
+        # (query, matching term ids) of the last ranked search, to narrow from
+        self._narrow: Optional[Tuple[str, List[int]]] = None
 
     def load(self):
         self._load_top_used()
+        self._load_index()
+
+    def _load_index(self):
+        """
+        Map the generated dataset if present. Otherwise map the index of the
+        built-in set cached by an earlier run, or index it now and cache it.
+        """
+        self._usage_ids = None
+        if DATA_FILE.exists():
+            try:
+                self._mapped = MappedEmojiIndex(DATA_FILE)
+                self._index = self._mapped
+                return
+            except Exception as e:
+                print(f"Emoji data load error: {e}")
+
+        self._narrow = None
+        cache_file = _builtin_cache_file()
+        if cache_file.exists():
+            try:
+                # Search only: categories still come from EMOJI_DATA, an
+                # emoji may be listed in several of them
+                self._index = MappedEmojiIndex(cache_file)
+                return
+            except Exception as e:
+                print(f"Emoji cache load error: {e}")
+
+        index = EmojiIndex()
+        for emoji, terms in _builtin_entries():
+            index.add(emoji, terms + [emoji])
+        self._index = index
+        threading.Thread(target=_write_builtin_cache, args=(cache_file,), daemon=True).start()
 
     def _load_top_used(self):
         if self.top_used_file.exists():
@@ -177,14 +231,16 @@ class EmojiDataManager:
                 with open(self.top_used_file, "r") as f:
                     data = json.load(f)
                     self.top_used = data.get("top", [])[:20]
+                    self.usage = data.get("counts", {})
             except Exception:
                 self.top_used = []
+                self.usage = {}
 
     def save_top_used(self):
         self.config_dir.mkdir(parents=True, exist_ok=True)
         try:
             with open(self.top_used_file, "w") as f:
-                json.dump({"top": self.top_used}, f)
+                json.dump({"top": self.top_used, "counts": self.usage}, f)
         except Exception as e:
             print(f"Top used save error: {e}")
 
@@ -193,6 +249,11 @@ class EmojiDataManager:
             self.top_used.remove(emoji)
         self.top_used.insert(0, emoji)
         self.top_used = self.top_used[:20]
+        self.usage[emoji] = self.usage.get(emoji, 0) + 1
+        if self._usage_ids is not None:
+            eid = self._index.emoji_id(emoji)
+            if eid is not None:
+                self._usage_ids[eid] = self.usage[emoji]
         self.save_top_used()
 
     def get_top_used(self) -> List[str]:
@@ -200,39 +261,91 @@ class EmojiDataManager:
 
     def get_category_emojis(self, category: str) -> List[str]:
         if category == "recent":
-            return list(self.top_used) if self.top_used else EMOJI_DATA["smileys"][:30]
+            if self.top_used:
+                return list(self.top_used)
+            return self.get_category_emojis("smileys")[:30]
+        if self._mapped is not None:
+            return self._mapped.category_emojis(category)
         return EMOJI_DATA.get(category, [])
 
     def search(self, query: str) -> List[str]:
         if not query:
             return []
         q = query.lower().strip()
-        results = []
-        seen = set()
-
-        # Search by keyword index
-        for emoji, terms in SEARCH_INDEX.items():
-            for term in terms:
-                if q in term or term.startswith(q):
-                    if emoji not in seen:
-                        results.append(emoji)
-                        seen.add(emoji)
-                    break
-
-        # Also search emoji char itself (paste an emoji to find it)
-        if q in SEARCH_INDEX and q not in seen:
-            results.insert(0, q)
+        results = self._index.search(q)
 
-        # Fallback: search all emojis in all categories by name match
-        if len(results) < 5:
-            for cat_emojis in EMOJI_DATA.values():
-                for emoji in cat_emojis:
-                    if emoji not in seen and q in emoji:
-                        results.append(emoji)
-                        seen.add(emoji)
+        # Pasted emoji char goes first
+        if q in self._index:
+            if q in results:
+                results.remove(q)
+            results.insert(0, q)
 
         return results[:60]
 
+    def _usage_by_id(self) -> Dict[int, int]:
+        if self._usage_ids is None:
+            self._usage_ids = {}
+            for emoji, count in self.usage.items():
+                eid = self._index.emoji_id(emoji)
+                if eid is not None:
+                    self._usage_ids[eid] = count
+        return self._usage_ids
+
+    def search_ranked(self, query: str, limit: int = 60) -> List[str]:
+        """Accent/case-insensitive, typo-tolerant search, best matches first"""
+        q = query.strip()
+        nq = normalize_term(q)
+        if not nq:
+            self._narrow = None
+            return []
+
+        # Typing extends the query: only re-check the previous matches.
+        # Single-char matches are prefix-only, so they can't be narrowed.
+        deadline = time.perf_counter() + RANK_BUDGET_S
+        candidates = None
+        if self._narrow and len(self._narrow[0]) > 1 and nq.startswith(self._narrow[0]):
+            candidates = self._narrow[1]
+        terms, complete = self._index.collect_terms(nq, candidates, deadline)
+        self._narrow = (nq, terms) if complete else None
+
+        results = self._index.rank(nq, limit, self._usage_by_id(), terms, deadline)
+
+        # Pasted emoji char goes first
+        if q in self._index:
+            if q in results:
+                results.remove(q)
+            results.insert(0, q)
+
+        return results[:limit]
+
     @staticmethod
     def get_categories() -> Dict[str, tuple]:
         return CATEGORIES
+
+
+def _builtin_entries() -> List[Tuple[str, List[str]]]:
+    """Each built-in emoji once, with its search terms"""
+    entries = dict((emoji, list(terms)) for emoji, terms in SEARCH_INDEX.items())
+    # Emoji chars themselves (paste an emoji to find it)
+    for cat_emojis in EMOJI_DATA.values():
+        for emoji in cat_emojis:
+            entries.setdefault(emoji, [])
+    return list(entries.items())
+
+
+def _builtin_cache_file() -> Path:
+    # Rebuilt whenever the built-in data or the file format changes
+    digest = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=8).hexdigest()
+    return CACHE_DIR / f"emoji-builtin-v{FORMAT_VERSION}-{digest}.bin"
+
+
+def _write_builtin_cache(path: Path):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        for stale in path.parent.glob("emoji-builtin-*.bin"):
+            stale.unlink(missing_ok=True)
+        tmp = path.with_suffix(".tmp")
+        write_index_file(tmp, {"all": _builtin_entries()})
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f"Emoji cache write error: {e}")
@@ -0,0 +1,498 @@
+"""Emoji Search Index - n-gram inverted index over search terms
+
+Two interchangeable backends share the same query code:
+
+* ``EmojiIndex``       built in memory (from the bundled literals)
+* ``MappedEmojiIndex`` memory-mapped from a compact binary file produced
+                       by ``scripts/build_emoji_data.py`` (full CLDR set)
+
+Binary layout (little-endian, all offsets absolute):
+
+    header    MAGIC, version, counts and table offsets (``_HEADER``)
+    emojis    n_emoji    x (str_off u32, str_len u16, category u16)
+    cats      n_cat      x (name_off u32, name_len u16, pad u16, start u32, count u32)
+    terms     n_term     x (str_off u32, str_len u16, pad u16, post_off u32, post_n u32)
+              sorted by UTF-8 bytes; postings are u32 emoji ids
+    grams     n_gram     x (key u64, post_off u32, post_n u32)
+              sorted by key; postings are u32 term ids
+    data      UTF-8 strings and 4-byte aligned posting arrays
+"""
+
+import heapq
+import mmap
+import struct
+import sys
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Start/end markers, so a prefix lookup is just another bigram lookup
+BOS = "\x02"
+EOS = "\x03"
+
+MAGIC = b"CDEMOJI\0"
+FORMAT_VERSION = 2
+
+# Ranked search must fit in a frame
+RANK_BUDGET_S = 0.004
+# Typo matches only when the exact tiers found at most FUZZY_MAX_HITS
+# emojis; one edit from 4 characters on, two from 8 (shorter queries are
+# within reach of almost any term)
+FUZZY_MAX_HITS = 5
+FUZZY_MIN_LEN = 4
+FUZZY_K2_MIN_LEN = 8
+
+_HEADER = struct.Struct("<8sIIIIIIIII")
+_EMOJI = struct.Struct("<IHH")
+_CAT = struct.Struct("<IHHII")
+_TERM = struct.Struct("<IHHII")
+_GRAM = struct.Struct("<QII")
+# Posting lists can be cast in place when native "I" is little-endian u32
+_NATIVE_U32 = sys.byteorder == "little" and struct.calcsize("I") == 4
+
+
+def fold(text: str) -> str:
+    """Casefold and strip diacritics from Latin, Greek and Cyrillic letters"""
+    out: List[str] = []
+    for ch in unicodedata.normalize("NFD", text.casefold()):
+        # Keep marks on other scripts (e.g. Japanese dakuten)
+        if unicodedata.combining(ch) and out and out[-1] < "\u0530":
+            continue
+        out.append(ch)
+    return unicodedata.normalize("NFC", "".join(out))
+
+
+def normalize_term(text: str) -> str:
+    """Fold case and accents, collapse whitespace"""
+    return " ".join(fold(text).split())
+
+
+def term_grams(term: str) -> Set[str]:
+    """Bigrams of a term padded with start/end markers"""
+    padded = f"{BOS}{term}{EOS}"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def prefix_distance(q: str, term: str, k: int) -> Optional[int]:
+    """Levenshtein distance from q to the closest prefix of term, if <= k"""
+    term = term[:len(q) + k]
+    prev = list(range(len(term) + 1))
+    for i, qc in enumerate(q, 1):
+        cur = [i]
+        for j, tc in enumerate(term, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (qc != tc)))
+        if min(cur) > k:
+            return None
+        prev = cur
+    best = min(prev)
+    return best if best <= k else None
+
+
+def gram_key(gram: str) -> int:
+    """Pack a two-codepoint gram into a sortable integer"""
+    return (ord(gram[0]) << 32) | ord(gram[1])
+
+
+class BaseEmojiIndex:
+    """
+    Inverted index: every normalized term is split into padded bigrams and
+    each bigram maps to the ids of the terms that contain it. A query only
+    walks the rarest posting list among its own bigrams and verifies those
+    few candidates, so it never scans the whole term set.
+    """
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def emoji(self, eid: int) -> str:
+        raise NotImplementedError
+
+    def term(self, tid: int) -> str:
+        raise NotImplementedError
+
+    def term_emojis(self, tid: int) -> Sequence[int]:
+        raise NotImplementedError
+
+    def gram_postings(self, gram: str) -> Sequence[int]:
+        raise NotImplementedError
+
+    def find_term(self, term: str) -> Optional[int]:
+        raise NotImplementedError
+
+    def _contains(self, tid: int, q: str) -> bool:
+        return q in self.term(tid)
+
+    def emoji_id(self, emoji: str) -> Optional[int]:
+        # Every emoji is indexed under itself
+        tid = self.find_term(normalize_term(emoji))
+        if tid is None:
+            return None
+        for eid in self.term_emojis(tid):
+            if self.emoji(eid) == emoji:
+                return eid
+        return None
+
+    def __contains__(self, emoji: str) -> bool:
+        return self.emoji_id(emoji) is not None
+
+    def iter_match_terms(self, q: str) -> Iterable[int]:
+        """Ids of the terms containing an already normalized query"""
+        if not q:
+            return ()
+        if len(q) == 1:
+            # A single character has no inner bigram: match prefixes only
+            return self.gram_postings(BOS + q)
+
+        rarest = min(
+            (self.gram_postings(q[i:i + 2]) for i in range(len(q) - 1)),
+            key=len,
+        )
+        return (tid for tid in rarest if self._contains(tid, q))
+
+    def match_terms(self, query: str) -> List[int]:
+        """Ids of the terms containing the query"""
+        return list(self.iter_match_terms(normalize_term(query)))
+
+    def collect_terms(
+        self,
+        q: str,
+        candidates: Optional[Sequence[int]] = None,
+        deadline: Optional[float] = None,
+    ) -> Tuple[List[int], bool]:
+        """
+        Ids of the terms containing the normalized query, and whether the
+        scan finished before the deadline. ``candidates`` narrows the scan
+        to the matches of a shorter query that q extends.
+        """
+        if candidates is None:
+            source = self.iter_match_terms(q)
+        else:
+            source = (tid for tid in candidates if self._contains(tid, q))
+        terms = []
+        for n, tid in enumerate(source):
+            if deadline and n % 128 == 127 and time.perf_counter() > deadline:
+                return terms, False
+            terms.append(tid)
+        return terms, True
+
+    def search(self, query: str, limit: int = 60) -> List[str]:
+        """Emojis with a term containing the query, in index order"""
+        seen: Set[int] = set()
+        for tid in self.match_terms(query):
+            seen.update(self.term_emojis(tid))
+        return [self.emoji(eid) for eid in sorted(seen)[:limit]]
+
+    def fuzzy_terms(
+        self, query: str, k: int, deadline: Optional[float] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        (term id, distance) for terms starting within k edits of the query.
+
+        Each edit destroys at most two of the query's bigrams, so a match
+        must contain at least one of its 2k+1 rarest bigrams: only those
+        posting lists are verified, under a fixed time budget.
+        """
+        q = normalize_term(query)
+        grams = {(BOS + q)[i:i + 2] for i in range(len(q))}
+        if len(grams) < 2 * k + 1:
+            return []
+        postings = sorted((self.gram_postings(g) for g in grams), key=len)[:2 * k + 1]
+
+        if deadline is None:
+            deadline = time.perf_counter() + RANK_BUDGET_S
+        seen: Set[int] = set()
+        matches = []
+        for plist in postings:
+            for n, tid in enumerate(plist):
+                if tid in seen:
+                    continue
+                seen.add(tid)
+                if n % 64 == 0 and time.perf_counter() > deadline:
+                    return matches
+                dist = prefix_distance(q, self.term(tid), k)
+                if dist is not None:
+                    matches.append((tid, dist))
+        return matches
+
+    def rank(
+        self,
+        query: str,
+        limit: int = 60,
+        usage: Optional[Dict[int, int]] = None,
+        terms: Optional[Sequence[int]] = None,
+        deadline: Optional[float] = None,
+    ) -> List[str]:
+        """
+        Emojis ordered by match quality, then by usage count (``usage``
+        maps emoji ids to times picked).
+
+        Tiers: exact term, term prefix, word prefix, substring, then, when
+        those found next to nothing, typo-tolerant prefix matches (one
+        edit, two for longer queries).
+        Work stops at the frame budget; very short queries that match a
+        large part of the corpus are ranked over what was reached by then.
+        ``terms`` are precomputed substring matches (see collect_terms).
+        """
+        q = normalize_term(query)
+        if not q:
+            return []
+        if deadline is None:
+            deadline = time.perf_counter() + RANK_BUDGET_S
+        if terms is None:
+            terms, _ = self.collect_terms(q, deadline=deadline)
+        best: Dict[int, Tuple[int, int]] = {}
+
+        def consider(tid: int, term: str, tier: int):
+            score = (tier, len(term))
+            for eid in self.term_emojis(tid):
+                if score < best.get(eid, (99, 0)):
+                    best[eid] = score
+
+        for n, tid in enumerate(terms):
+            if n % 128 == 127 and time.perf_counter() > deadline:
+                break
+            term = self.term(tid)
+            if term == q:
+                tier = 0
+            elif term.startswith(q):
+                tier = 1
+            elif f" {q}" in term:
+                tier = 2
+            else:
+                tier = 3
+            consider(tid, term, tier)
+
+        # Exact tiers always outrank typos, which only stand in for a miss
+        if len(best) <= FUZZY_MAX_HITS and len(q) >= FUZZY_MIN_LEN:
+            k = 1 if len(q) < FUZZY_K2_MIN_LEN else 2
+            for tid, dist in self.fuzzy_terms(q, k, deadline):
+                consider(tid, self.term(tid), 4 + dist)
+
+        counts = usage or {}
+        ranked = heapq.nsmallest(limit, (
+            (tier, -counts.get(eid, 0), term_len, eid)
+            for eid, (tier, term_len) in best.items()
+        ))
+        return [self.emoji(eid) for *_, eid in ranked[:limit]]
+
+
+class EmojiIndex(BaseEmojiIndex):
+    """In-memory index, built once at load time"""
+
+    def __init__(self):
+        self.emojis: List[str] = []
+        self.terms: List[str] = []
+        self._emoji_ids: Dict[str, int] = {}
+        self._term_ids: Dict[str, int] = {}
+        self._term_emojis: List[List[int]] = []
+        self._grams: Dict[str, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.emojis)
+
+    def emoji(self, eid: int) -> str:
+        return self.emojis[eid]
+
+    def term(self, tid: int) -> str:
+        return self.terms[tid]
+
+    def term_emojis(self, tid: int) -> Sequence[int]:
+        return self._term_emojis[tid]
+
+    def gram_postings(self, gram: str) -> Sequence[int]:
+        return self._grams.get(gram, ())
+
+    def find_term(self, term: str) -> Optional[int]:
+        return self._term_ids.get(term)
+
+    def add(self, emoji: str, terms: Iterable[str]) -> int:
+        """Index an emoji under the given terms, returns its id"""
+        eid = self._emoji_ids.get(emoji)
+        if eid is None:
+            eid = len(self.emojis)
+            self.emojis.append(emoji)
+            self._emoji_ids[emoji] = eid
+
+        for term in terms:
+            t = normalize_term(term)
+            if not t:
+                continue
+            tid = self._term_ids.get(t)
+            if tid is None:
+                tid = len(self.terms)
+                self.terms.append(t)
+                self._term_ids[t] = tid
+                self._term_emojis.append([])
+                for gram in term_grams(t):
+                    self._grams.setdefault(gram, []).append(tid)
+            postings = self._term_emojis[tid]
+            if eid not in postings:
+                postings.append(eid)
+        return eid
+
+
+class MappedEmojiIndex(BaseEmojiIndex):
+    """Read-only index over a memory-mapped file, decoded on demand"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self._n_emoji, n_cat, self._n_term, self._n_gram,
+             self._off_emoji, off_cat, self._off_term, self._off_gram) = \
+                _HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{self.path.name}: unsupported emoji data format")
+        except Exception:
+            self._mm.close()
+            raise
+
+        self._view = memoryview(self._mm)
+        # A handful of categories: decode the table once
+        self.categories: Dict[str, Tuple[int, int]] = {}
+        for i in range(n_cat):
+            name_off, name_len, _, start, count = _CAT.unpack_from(
+                self._mm, off_cat + i * _CAT.size
+            )
+            self.categories[self._str(name_off, name_len)] = (start, count)
+
+    def close(self):
+        self._view.release()
+        self._mm.close()
+
+    def _str(self, off: int, length: int) -> str:
+        return self._mm[off:off + length].decode("utf-8")
+
+    def _u32s(self, off: int, n: int) -> Sequence[int]:
+        # The file is little-endian; a zero-copy view only matches that layout
+        if _NATIVE_U32:
+            return self._view[off:off + 4 * n].cast("I")
+        return struct.unpack_from(f"<{n}I", self._mm, off)
+
+    def __len__(self) -> int:
+        return self._n_emoji
+
+    def emoji(self, eid: int) -> str:
+        off, length, _ = _EMOJI.unpack_from(self._mm, self._off_emoji + eid * _EMOJI.size)
+        return self._str(off, length)
+
+    def _term_entry(self, tid: int) -> Tuple[int, int, int, int, int]:
+        return _TERM.unpack_from(self._mm, self._off_term + tid * _TERM.size)
+
+    def _term_bytes(self, tid: int) -> bytes:
+        off, length, _, _, _ = self._term_entry(tid)
+        return self._mm[off:off + length]
+
+    def term(self, tid: int) -> str:
+        return self._term_bytes(tid).decode("utf-8")
+
+    def term_emojis(self, tid: int) -> Sequence[int]:
+        _, _, _, post_off, post_n = self._term_entry(tid)
+        return self._u32s(post_off, post_n)
+
+    def _contains(self, tid: int, q: str) -> bool:
+        # Substring on UTF-8 bytes, no decode per candidate
+        return q.encode("utf-8") in self._term_bytes(tid)
+
+    def gram_postings(self, gram: str) -> Sequence[int]:
+        key = gram_key(gram)
+        lo, hi = 0, self._n_gram
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k, post_off, post_n = _GRAM.unpack_from(self._mm, self._off_gram + mid * _GRAM.size)
+            if k == key:
+                return self._u32s(post_off, post_n)
+            if k < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return ()
+
+    def find_term(self, term: str) -> Optional[int]:
+        needle = term.encode("utf-8")
+        lo, hi = 0, self._n_term
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_bytes(mid) < needle:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._n_term and self._term_bytes(lo) == needle:
+            return lo
+        return None
+
+    def category_emojis(self, category: str) -> List[str]:
+        start, count = self.categories.get(category, (0, 0))
+        return [self.emoji(eid) for eid in range(start, start + count)]
+
+
+def write_index_file(
+    path: Path,
+    categories: Dict[str, List[Tuple[str, List[str]]]],
+):
+    """
+    Serialize ``{category: [(emoji, terms), ...]}`` into the binary format.
+    Emojis are laid out category by category so each one is a contiguous
+    id range.
+    """
+    index = EmojiIndex()
+    cat_ranges = []
+    for name, entries in categories.items():
+        start = len(index)
+        for emoji, terms in entries:
+            index.add(emoji, list(terms) + [emoji])
+        cat_ranges.append((name, start, len(index) - start))
+
+    # Terms sorted by their UTF-8 bytes so lookups can bisect
+    order = sorted(range(len(index.terms)), key=lambda t: index.terms[t].encode("utf-8"))
+    new_tid = [0] * len(order)
+    for new, old in enumerate(order):
+        new_tid[old] = new
+    grams = sorted(
+        (gram_key(g), sorted(new_tid[t] for t in tids))
+        for g, tids in index._grams.items()
+    )
+
+    n_emoji, n_cat, n_term, n_gram = len(index.emojis), len(cat_ranges), len(order), len(grams)
+    off_emoji = _HEADER.size
+    off_cat = off_emoji + n_emoji * _EMOJI.size
+    off_term = off_cat + n_cat * _CAT.size
+    off_gram = off_term + n_term * _TERM.size
+    data = bytearray()
+    data_base = off_gram + n_gram * _GRAM.size
+
+    def put_str(s: str) -> Tuple[int, int]:
+        raw = s.encode("utf-8")
+        off = data_base + len(data)
+        data.extend(raw)
+        return off, len(raw)
+
+    def put_u32s(values: Sequence[int]) -> int:
+        data.extend(b"\0" * (-(data_base + len(data)) % 4))
+        off = data_base + len(data)
+        data.extend(struct.pack(f"<{len(values)}I", *values))
+        return off
+
+    cat_of = [0] * n_emoji
+    for ci, (_, start, count) in enumerate(cat_ranges):
+        for eid in range(start, start + count):
+            cat_of[eid] = ci
+
+    out = bytearray(_HEADER.pack(
+        MAGIC, FORMAT_VERSION, n_emoji, n_cat, n_term, n_gram,
+        off_emoji, off_cat, off_term, off_gram,
+    ))
+    for eid, emoji in enumerate(index.emojis):
+        out += _EMOJI.pack(*put_str(emoji), cat_of[eid])
+    for name, start, count in cat_ranges:
+        out += _CAT.pack(*put_str(name), 0, start, count)
+    for old in order:
+        postings = sorted(index._term_emojis[old])
+        s_off, s_len = put_str(index.terms[old])
+        out += _TERM.pack(s_off, s_len, 0, put_u32s(postings), len(postings))
+    for key, tids in grams:
+        out += _GRAM.pack(key, put_u32s(tids), len(tids))
+
+    Path(path).write_bytes(bytes(out + data))
@@ -0,0 +1,616 @@
+"""Clipboard History Storage - append-only journal or SQLite with FTS5"""
+
+import hashlib
+import html
+import json
+import os
+import queue
+import re
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple, Union
+from urllib.parse import unquote
+
+from .blob_store import BlobStore
+
+# (text, timestamp), as stored by the legacy JSON history
+Entry = Tuple[str, str]
+
+# Payloads above this many bytes are kept in a blob file, not in memory
+SPILL_BYTES = 64 * 1024
+PREVIEW_CHARS = 120
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def data_hash(mime: str, data: bytes) -> str:
+    """Key for non-text payloads; the MIME type is part of the identity"""
+    h = hashlib.blake2b(mime.encode("ascii"), digest_size=16)
+    h.update(b"\0")
+    h.update(data)
+    return h.hexdigest()
+
+
+def make_preview(text: str) -> str:
+    preview = text[:PREVIEW_CHARS].replace("\n", " ")
+    if len(text) > PREVIEW_CHARS:
+        preview += "…"
+    return preview
+
+
+def rich_preview(mime: str, data: bytes) -> str:
+    """Row label for a non-text entry, computed without decoding images"""
+    if mime == "image/png":
+        # IHDR: width and height right after the 8-byte signature + chunk header
+        if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+            w, h = struct.unpack(">II", data[16:24])
+            return f"🖼  Imagen {w}×{h}"
+        return "🖼  Imagen"
+    text = data.decode("utf-8", errors="replace")
+    if mime == "text/uri-list":
+        uris = [u for u in text.splitlines() if u and not u.startswith("#")]
+        names = [unquote(u.rstrip("/").rsplit("/", 1)[-1]) for u in uris]
+        return make_preview("📁  " + ", ".join(names))
+    if mime == "text/html":
+        return make_preview(html_to_text(text))
+    return make_preview(text)
+
+
+def html_to_text(markup: str) -> str:
+    text = re.sub(r"(?is)<(script|style).*?</\1>|<[^>]+>", " ", markup)
+    return " ".join(html.unescape(text).split())
+
+
+@dataclass
+class ClipEntry:
+    """
+    One history item; text is None when the payload is not held in memory.
+    Non-text entries (images, HTML, URI lists) always live in a blob.
+    """
+
+    key: str
+    timestamp: str
+    preview: str
+    size: int
+    text: Optional[str] = None
+    mime: str = "text/plain"
+
+    @classmethod
+    def from_text(cls, key: str, text: str, timestamp: str) -> "ClipEntry":
+        size = len(text.encode("utf-8"))
+        kept = text if size <= SPILL_BYTES else None
+        return cls(key, timestamp, make_preview(text), size, kept)
+
+    def record(self) -> dict:
+        """Journal "add" record describing this entry"""
+        record = {"op": "add", "key": self.key, "ts": self.timestamp}
+        if self.text is not None:
+            record["text"] = self.text
+        else:
+            record.update(preview=self.preview, size=self.size)
+        if self.mime != "text/plain":
+            record["mime"] = self.mime
+        return record
+
+
+class HistoryStore:
+    """
+    Base for history backends. Mutations are queued and applied by one
+    writer thread, so the GTK thread never waits on the disk. Spilled
+    payloads are written to the blob store by that thread too.
+    """
+
+    # Whether search() can query beyond the in-memory window
+    searchable = False
+
+    def __init__(self, blobs: BlobStore):
+        self.blobs = blobs
+        self._queue: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self) -> List[ClipEntry]:
+        """Newest entries first"""
+        raise NotImplementedError
+
+    def search(self, query: str, offset: int, limit: int) -> List[ClipEntry]:
+        raise NotImplementedError
+
+    def get_text(self, key: str) -> Optional[str]:
+        """Payload of an entry that is neither in memory nor in a blob"""
+        return None
+
+    def add(self, entry: ClipEntry, payload: Union[str, bytes, None] = None):
+        """
+        Record a copy. payload is the full content of a new entry; None
+        means the key is already stored and only its timestamp changes.
+        """
+        record = {"op": "add", "key": entry.key, "ts": entry.timestamp, "time": time.time()}
+        if payload is not None:
+            record.update(entry.record())
+            if entry.text is None:
+                record["blob"] = payload
+        self._submit(record)
+
+    def remove(self, key: str):
+        self._submit({"op": "del", "key": key})
+
+    def clear(self):
+        self._submit({"op": "clear"})
+
+    def flush(self, timeout: float = 1.0):
+        """Wait (up to timeout) until every queued record is applied and committed"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put({"op": "flush", "done": done})
+        done.wait(timeout)
+
+    def close(self):
+        """Apply pending records and stop the writer thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # ── Writer thread ──────────────────────────────────────────────────────
+
+    def _submit(self, record: dict):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="clipboard-store", daemon=True
+            )
+            self._thread.start()
+        self._queue.put(record)
+
+    def _run(self):
+        while True:
+            try:
+                record = self._queue.get(timeout=self._idle_timeout())
+            except queue.Empty:
+                record = {"op": "idle"}
+            # A failing disk or a locked database must not end the thread:
+            # the records after it would only pile up in memory
+            try:
+                self._handle(record)
+            except Exception as e:
+                print(f"Clipboard store error: {e}")
+            if record is None:
+                return
+
+    def _handle(self, record: Optional[dict]):
+        if record is None or record["op"] == "idle":
+            self._on_idle()
+            return
+        if record["op"] == "flush":
+            try:
+                self._on_idle()
+            finally:
+                record["done"].set()
+            return
+        blob = record.pop("blob", None)
+        if isinstance(blob, str):
+            blob = blob.encode("utf-8")
+        if blob is not None:
+            self.blobs.put(record["key"], blob)
+        self._apply(record)
+
+    def _idle_timeout(self) -> Optional[float]:
+        """Seconds to wait for a record before calling _on_idle (None: forever)"""
+        return None
+
+    def _on_idle(self):
+        pass
+
+    def _apply(self, record: dict):
+        raise NotImplementedError
+
+
+def apply_record(entries: "OrderedDict[str, ClipEntry]", record: dict, max_entries: int):
+    """Replay one journal record onto a key -> entry map (newest last)"""
+    op = record.get("op")
+    if op == "add":
+        # Records from before content keys carry only the text
+        key = record.get("key") or content_hash(record["text"])
+        ts = record.get("ts", "")
+        if "text" in record:
+            entries[key] = ClipEntry.from_text(key, record["text"], ts)
+        elif "size" in record:
+            entries[key] = ClipEntry(
+                key, ts, record["preview"], record["size"], mime=record.get("mime", "text/plain")
+            )
+        elif key in entries:
+            entries[key].timestamp = ts
+        else:
+            return
+        entries.move_to_end(key)
+        while len(entries) > max_entries:
+            entries.popitem(last=False)
+    elif op == "del":
+        entries.pop(record.get("key") or content_hash(record["text"]), None)
+    elif op == "clear":
+        entries.clear()
+
+
+class JournalStore(HistoryStore):
+    """
+    One JSON record per line, appended as changes happen. Appends are
+    fsync'd in batches (every SYNC_EVERY records or SYNC_INTERVAL seconds);
+    once the journal grows past compact_after records it is rewritten from
+    a snapshot into a temp file and atomically renamed over the old one.
+    A torn last line from a crash is dropped on load. Re-copies of a known
+    entry are logged by key only, and spilled entries only by preview, so
+    large texts are written once. Compaction also drops orphaned blobs.
+    """
+
+    SYNC_EVERY = 32
+    SYNC_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        path: Path,
+        blobs: BlobStore,
+        snapshot: Callable[[], List[ClipEntry]],
+        max_entries: int,
+    ):
+        super().__init__(blobs)
+        self.path = path
+        self.max_entries = max_entries
+        self.compact_after = max(4 * max_entries, 200)
+        self._snapshot = snapshot
+        self._file = None
+        self._records = 0
+        self._unsynced = 0
+
+    def load(self, legacy_file: Optional[Path] = None) -> List[ClipEntry]:
+        entries: "OrderedDict[str, ClipEntry]" = OrderedDict()
+        if self.path.exists():
+            with open(self.path, "rb") as f:
+                data = f.read()
+            # Drop a torn last line so new records start on a fresh line
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                with open(self.path, "r+b") as f:
+                    f.truncate(end)
+            for line in data[:end].splitlines():
+                try:
+                    apply_record(entries, json.loads(line), self.max_entries)
+                except (ValueError, KeyError):
+                    continue
+                self._records += 1
+        elif legacy_file is not None and legacy_file.exists():
+            # Re-record into the journal, spilling large entries on the way
+            for text, ts in reversed(self._load_legacy(legacy_file)):
+                entry = ClipEntry.from_text(content_hash(text), text, ts)
+                entries[entry.key] = entry
+                self.add(entry, text)
+        return list(reversed(entries.values()))
+
+    def _load_legacy(self, legacy_file: Path) -> List[Entry]:
+        """Import the old single-file JSON history"""
+        entries: List[Entry] = []
+        try:
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                raw = json.load(f).get("history", [])
+            # Support both old (str) and new (list) formats
+            for item in raw:
+                if isinstance(item, list) and len(item) == 2:
+                    entries.append((item[0], item[1]))
+                elif isinstance(item, str):
+                    entries.append((item, ""))
+        except Exception as e:
+            print(f"Clipboard load error: {e}")
+        return entries[: self.max_entries]
+
+    def close(self):
+        super().close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ── Writer thread ──────────────────────────────────────────────────────
+
+    def _open(self):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def _apply(self, record: dict):
+        if record["op"] == "del":
+            self.blobs.delete(record["key"])
+        elif record["op"] == "clear":
+            self.blobs.clear()
+        f = self._open()
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        self._records += 1
+        self._unsynced += 1
+        if self._unsynced >= self.SYNC_EVERY:
+            self._sync()
+        if self._records > self.compact_after:
+            self._compact()
+
+    def _idle_timeout(self) -> Optional[float]:
+        return self.SYNC_INTERVAL if self._unsynced else None
+
+    def _on_idle(self):
+        self._sync()
+
+    def _sync(self):
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def _compact(self):
+        """Rewrite the journal as one add record per live entry"""
+        entries = self._snapshot()
+        tmp = self.path.with_suffix(".tmp")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            for entry in reversed(entries):
+                f.write(json.dumps(entry.record(), ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        os.replace(tmp, self.path)
+        dir_fd = os.open(self.path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+        self._records = len(entries)
+        self._unsynced = 0
+        self.blobs.retain(e.key for e in entries if e.text is None)
+
+
+def format_timestamp(created: float) -> str:
+    """HH:MM for today, dd/mm HH:MM for older entries"""
+    dt = datetime.fromtimestamp(created)
+    if dt.date() == datetime.now().date():
+        return dt.strftime("%H:%M")
+    return dt.strftime("%d/%m %H:%M")
+
+
+class SqliteStore(HistoryStore):
+    """
+    Large history in SQLite (WAL). Entries keep their full timestamp,
+    content hash (for dedup) and byte size; an FTS5 external-content table
+    kept in sync by triggers serves search. Only the newest max_entries
+    rows are loaded at startup, older ones are read page by page on demand
+    and their text only when re-copied. Spilled entries store just their
+    preview (blob = 1). Falls back to LIKE queries without FTS5.
+    """
+
+    searchable = True
+    COMMIT_INTERVAL = 0.1
+    COMMIT_EVERY = 64
+    EVICT_EVERY = 256
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            id      INTEGER PRIMARY KEY,
+            hash    TEXT NOT NULL UNIQUE,
+            text    TEXT NOT NULL,
+            created REAL NOT NULL,
+            size    INTEGER NOT NULL,
+            blob    INTEGER NOT NULL DEFAULT 0,
+            mime    TEXT NOT NULL DEFAULT 'text/plain'
+        );
+        CREATE INDEX IF NOT EXISTS entries_created ON entries(created);
+    """
+    FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+            text, content='entries', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        );
+        CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+            INSERT INTO entries_fts(rowid, text) VALUES (new.id, new.text);
+        END;
+        CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+            INSERT INTO entries_fts(entries_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        END;
+    """
+
+    def __init__(self, path: Path, blobs: BlobStore, max_entries: int, capacity: int):
+        super().__init__(blobs)
+        self.path = path
+        self.max_entries = max_entries
+        self.capacity = max(capacity, max_entries)
+        self._fts = True
+        self._reader: Optional[sqlite3.Connection] = None
+        self._reader_lock = threading.Lock()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._pending = 0
+        self._inserts = 0
+
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, **kwargs)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _open_reader(self) -> sqlite3.Connection:
+        if self._reader is None:
+            conn = self._connect(check_same_thread=False)
+            conn.executescript(self.SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+            if "blob" not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN blob INTEGER NOT NULL DEFAULT 0")
+            if "mime" not in columns:
+                conn.execute("ALTER TABLE entries ADD COLUMN mime TEXT NOT NULL DEFAULT 'text/plain'")
+            try:
+                conn.executescript(self.FTS_SCHEMA)
+            except sqlite3.OperationalError as e:
+                print(f"Clipboard FTS5 unavailable, using LIKE search: {e}")
+                self._fts = False
+            conn.commit()
+            self._reader = conn
+        return self._reader
+
+    def load(self, legacy_file: Optional[Path] = None) -> List[ClipEntry]:
+        with self._reader_lock:
+            conn = self._open_reader()
+            empty = conn.execute("SELECT 1 FROM entries LIMIT 1").fetchone() is None
+        if empty and legacy_file is not None and legacy_file.exists():
+            self._import_journal(legacy_file)
+        with self._reader_lock:
+            rows = self._open_reader().execute(
+                "SELECT hash, text, created, size, blob, mime FROM entries "
+                "ORDER BY created DESC LIMIT ?",
+                (self.max_entries,),
+            ).fetchall()
+        return [
+            ClipEntry(key, format_timestamp(created), text if blob else make_preview(text), size,
+                      None if blob else text, mime)
+            for key, text, created, size, blob, mime in rows
+        ]
+
+    def _import_journal(self, journal_file: Path):
+        """Seed the database from the journal backend's history (blobs are shared)"""
+        entries = JournalStore(journal_file, self.blobs, list, self.capacity).load()
+        now = time.time()
+        # Journal entries only have HH:MM; keep their order with synthetic times
+        rows = [
+            (e.key, e.preview if e.text is None else e.text, now - i, e.size, e.text is None, e.mime)
+            for i, e in enumerate(entries)
+        ]
+        with self._reader_lock:
+            conn = self._open_reader()
+            conn.executemany(
+                "INSERT OR IGNORE INTO entries(hash, text, created, size, blob, mime) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            conn.commit()
+
+    def search(self, query: str, offset: int, limit: int) -> List[ClipEntry]:
+        """Entries matching query (all if empty), newest first; previews only"""
+        # Copies made just before are still in the writer's open transaction
+        self.flush()
+        columns = f"e.hash, substr(e.text, 1, {PREVIEW_CHARS + 1}), e.created, e.size, e.blob, e.mime"
+        tokens = re.findall(r"\w+", query)
+        if not query.strip():
+            sql = f"SELECT {columns} FROM entries e ORDER BY e.created DESC LIMIT ? OFFSET ?"
+            params: tuple = (limit, offset)
+        elif self._fts and tokens:
+            # Every token as a quoted prefix: "foo"* "bar"*
+            match = " ".join(f'"{t}"*' for t in tokens)
+            sql = (
+                f"SELECT {columns} FROM entries_fts f JOIN entries e ON e.id = f.rowid "
+                "WHERE entries_fts MATCH ? ORDER BY e.created DESC LIMIT ? OFFSET ?"
+            )
+            params = (match, limit, offset)
+        else:
+            pattern = "%" + re.sub(r"([%_\\])", r"\\\1", query.strip()) + "%"
+            sql = (
+                f"SELECT {columns} FROM entries e WHERE e.text LIKE ? ESCAPE '\\' "
+                "ORDER BY e.created DESC LIMIT ? OFFSET ?"
+            )
+            params = (pattern, limit, offset)
+        with self._reader_lock:
+            rows = self._open_reader().execute(sql, params).fetchall()
+        return [
+            ClipEntry(key, format_timestamp(created), head if blob else make_preview(head), size,
+                      mime=mime)
+            for key, head, created, size, blob, mime in rows
+        ]
+
+    def get_text(self, key: str) -> Optional[str]:
+        with self._reader_lock:
+            row = self._open_reader().execute(
+                "SELECT text FROM entries WHERE hash = ? AND blob = 0", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def count(self) -> int:
+        with self._reader_lock:
+            return self._open_reader().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        super().close()
+        with self._reader_lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    # ── Writer thread ──────────────────────────────────────────────────────
+
+    def _run(self):
+        try:
+            super()._run()
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def _apply(self, record: dict):
+        if self._writer is None:
+            self._open_reader()  # schema
+            self._writer = self._connect()
+        db = self._writer
+        op = record["op"]
+        if op == "add":
+            created = record.get("time", time.time())
+            if "size" not in record and "text" not in record:
+                db.execute("UPDATE entries SET created = ? WHERE hash = ?", (created, record["key"]))
+            else:
+                text = record.get("text")
+                db.execute(
+                    "INSERT INTO entries(hash, text, created, size, blob, mime) "
+                    "VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(hash) DO UPDATE SET created = excluded.created",
+                    (
+                        record["key"],
+                        record["preview"] if text is None else text,
+                        created,
+                        record["size"] if text is None else len(text.encode("utf-8")),
+                        text is None,
+                        record.get("mime", "text/plain"),
+                    ),
+                )
+            self._inserts += 1
+            if self._inserts % self.EVICT_EVERY == 0:
+                self._evict()
+        elif op == "del":
+            db.execute("DELETE FROM entries WHERE hash = ?", (record["key"],))
+            self.blobs.delete(record["key"])
+        elif op == "clear":
+            db.execute("DELETE FROM entries")
+            self.blobs.clear()
+        self._pending += 1
+        if self._pending >= self.COMMIT_EVERY:
+            self._commit()
+
+    def _evict(self):
+        """Drop the oldest rows beyond capacity, and their blobs"""
+        old = "SELECT id FROM entries ORDER BY created DESC LIMIT -1 OFFSET ?"
+        spilled = self._writer.execute(
+            f"SELECT hash FROM entries WHERE blob = 1 AND id IN ({old})", (self.capacity,)
+        ).fetchall()
+        self._writer.execute(f"DELETE FROM entries WHERE id IN ({old})", (self.capacity,))
+        for (key,) in spilled:
+            self.blobs.delete(key)
+        self._pending += 1
+
+    def _commit(self):
+        if self._writer is not None and self._pending:
+            self._writer.commit()
+            self._pending = 0
+
+    def _idle_timeout(self) -> Optional[float]:
+        return self.COMMIT_INTERVAL if self._pending else None
+
+    def _on_idle(self):
+        self._commit()
@@ -0,0 +1,201 @@
+"""HTTP Pool - keep-alive connections shared by the translator providers"""
+
+import base64
+import http.client
+import json
+import threading
+import urllib.request
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import SplitResult, unquote, urlsplit
+
+# (scheme, host, port)
+HostKey = Tuple[str, str, int]
+
+# Raised when a reused keep-alive connection turns out to be closed by the server
+_STALE = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+class HTTPError(RuntimeError):
+    def __init__(self, status: int, reason: str, body: bytes = b""):
+        super().__init__(f"HTTP {status}: {reason}")
+        self.status = status
+        self.reason = reason
+        self.body = body
+
+
+class HttpPool:
+    """
+    Persistent HTTP/1.1 connections per host, so sequential requests to a
+    provider skip the TCP and TLS handshakes. At most max_per_host
+    connections per host are in use at once (extra callers wait) and idle
+    ones are kept for reuse. A request on a reused connection that the
+    server already closed is retried once on a fresh one.
+
+    The http_proxy / https_proxy / no_proxy environment is honoured like
+    urllib does: plain HTTP goes to the proxy with absolute URLs, HTTPS is
+    tunnelled through it with CONNECT.
+    """
+
+    def __init__(self, max_per_host: int = 4, timeout: float = 15, user_agent: str = "CyberDash/1.0"):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._idle: Dict[HostKey, List[http.client.HTTPConnection]] = {}
+        self._slots: Dict[HostKey, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._proxies = urllib.request.getproxies()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> bytes:
+        """Send a request and return the response body; raises HTTPError on 4xx/5xx"""
+        with self.stream(method, url, body, headers, timeout) as resp:
+            return resp.read()
+
+    def request_json(
+        self,
+        method: str,
+        url: str,
+        payload: Optional[dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ):
+        body = None
+        headers = dict(headers or {})
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            headers.setdefault("Content-Type", "application/json")
+        return json.loads(self.request(method, url, body, headers, timeout))
+
+    @contextmanager
+    def stream(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[http.client.HTTPResponse]:
+        """
+        Yield the response unread, for incremental reading. The connection
+        goes back to the pool only if the body was read to the end.
+        """
+        parts = urlsplit(url)
+        key = self._host_key(parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        headers = {"User-Agent": self.user_agent, **(headers or {})}
+        proxy = self._proxy_for(parts.scheme, parts.hostname)
+        if proxy is not None and parts.scheme == "http":
+            # Through a plain HTTP proxy the request line carries the full URL
+            path = parts._replace(fragment="").geturl()
+            headers.update(_proxy_auth(proxy))
+
+        slot = self._slot(key)
+        slot.acquire()
+        conn = None
+        try:
+            conn, resp = self._send(key, proxy, method, path, body, headers, timeout or self.timeout)
+            if resp.status >= 400:
+                error = HTTPError(resp.status, resp.reason, resp.read())
+                if not resp.will_close:
+                    self._release(key, conn)
+                    conn = None
+                raise error
+            yield resp
+            if resp.isclosed() and not resp.will_close:
+                self._release(key, conn)
+                conn = None
+        finally:
+            if conn is not None:
+                conn.close()
+            slot.release()
+
+    def close(self):
+        with self._lock:
+            for conns in self._idle.values():
+                for conn in conns:
+                    conn.close()
+            self._idle.clear()
+
+    # ── Connections ────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _host_key(scheme: str, host: Optional[str], port: Optional[int]) -> HostKey:
+        if scheme not in ("http", "https") or not host:
+            raise ValueError(f"Unsupported URL: {scheme}://{host}")
+        return scheme, host, port or (443 if scheme == "https" else 80)
+
+    def _slot(self, key: HostKey) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            return slot
+
+    def _proxy_for(self, scheme: str, host: str) -> Optional[SplitResult]:
+        proxy = self._proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        if "://" not in proxy:
+            proxy = "http://" + proxy
+        return urlsplit(proxy)
+
+    def _send(self, key: HostKey, proxy: Optional[SplitResult], method, path, body, headers, timeout):
+        for attempt in range(2):
+            conn, reused = self._acquire(key, proxy, timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                return conn, conn.getresponse()
+            except _STALE:
+                conn.close()
+                # Only a reused connection may have gone stale; retry once
+                if not reused or attempt:
+                    raise
+            except Exception:
+                conn.close()
+                raise
+        raise AssertionError("unreachable")
+
+    def _acquire(
+        self, key: HostKey, proxy: Optional[SplitResult], timeout: float
+    ) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        if proxy is None:
+            return cls(host, port, timeout=timeout), False
+        conn = cls(proxy.hostname, proxy.port or 80, timeout=timeout)
+        if scheme == "https":
+            conn.set_tunnel(host, port, headers=_proxy_auth(proxy))
+        return conn, False
+
+    def _release(self, key: HostKey, conn: http.client.HTTPConnection):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+
+def _proxy_auth(proxy: SplitResult) -> Dict[str, str]:
+    """Proxy-Authorization header for credentials in the proxy URL"""
+    if proxy.username is None:
+        return {}
+    credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+    return {"Proxy-Authorization": "Basic " + base64.b64encode(credentials.encode()).decode()}
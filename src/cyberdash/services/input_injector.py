@@ -0,0 +1,186 @@
+"""Input Injector - persistent xdotool process for auto-paste and typing"""
+
+import os
+import queue
+import select
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Callable, List, Optional
+
+# Temporary files for type_text(); script lines cannot quote a path with spaces
+_TYPE_DIR = None if not any(c.isspace() for c in tempfile.gettempdir()) else "/tmp"
+
+
+class InputInjector:
+    """
+    Keystrokes and focus changes through one long-lived `xdotool -`
+    process fed over a pipe, instead of a fork per action. Commands run on
+    a worker thread, so every call returns immediately.
+
+    remember_active_window() records the window that had focus when
+    CyberDash was summoned, synchronously and before the window is
+    presented, so it cannot pick up CyberDash itself; paste() re-activates
+    it with `windowactivate --sync`, which returns as soon as the window
+    manager has actually handed focus back, and only then sends Ctrl+V.
+    type_text() goes through the same process, reading the text from a
+    private temporary file.
+
+    Install:  sudo apt install xdotool
+    """
+
+    REPLY_TIMEOUT = 3.0
+    # remember_active_window() blocks the GTK thread for at most this long
+    REMEMBER_TIMEOUT = 0.2
+    # Blind wait before pasting when the previous window is unknown
+    FALLBACK_DELAY = 0.15
+    # Extra reply wait per typed character (xdotool types every 12 ms)
+    TYPE_DELAY = 0.03
+
+    def __init__(self):
+        self.target_window: Optional[str] = None
+        self._available: Optional[bool] = None
+        self._proc: Optional[subprocess.Popen] = None
+        self._buf = b""
+        # One conversation with the xdotool process at a time
+        self._lock = threading.Lock()
+        self._jobs: "queue.Queue[Optional[Callable]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def available(self) -> bool:
+        if self._available is None:
+            self._available = shutil.which("xdotool") is not None
+        return self._available
+
+    def remember_active_window(self, ignore: Optional[str] = None):
+        """
+        Record the currently focused window as the paste target, unless it
+        is ignore (our own window id). Blocks briefly; if xdotool is busy or
+        slow the previous target is kept.
+        """
+        if not self.available():
+            return
+        window = self._command(["getactivewindow"], self.REMEMBER_TIMEOUT)
+        if window and window != ignore:
+            self.target_window = window
+
+    def paste(self) -> bool:
+        """Focus the target window, then send Ctrl+V"""
+        if not self.available():
+            return False
+        self._submit(self._paste)
+        return True
+
+    def type_text(self, text: str) -> bool:
+        """Focus the target window, then type text"""
+        if not self.available():
+            return False
+        self._submit(lambda: self._type(text))
+        return True
+
+    def close(self):
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread.join(timeout=2)
+            self._thread = None
+        self._stop()
+
+    # ── Worker thread ──────────────────────────────────────────────────────
+
+    def _submit(self, job: Callable):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="input-injector", daemon=True)
+            self._thread.start()
+        self._jobs.put(job)
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            try:
+                job()
+            except Exception as e:
+                print(f"Input injector error: {e}")
+
+    def _paste(self):
+        if self.target_window:
+            lines = [f"windowactivate --sync {self.target_window}"]
+        else:
+            lines = [f"sleep {self.FALLBACK_DELAY}"]
+        # getactivewindow doubles as the "done" acknowledgement
+        self._command(lines + ["key --clearmodifiers ctrl+v", "getactivewindow"])
+
+    def _type(self, text: str):
+        # Script lines are split on whitespace with no quoting, so arbitrary
+        # text cannot go through the pipe; it is typed from a file instead
+        # (mkstemp: readable by us only, and a path without spaces)
+        fd, path = tempfile.mkstemp(prefix="cyberdash-type-", dir=_TYPE_DIR)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            lines = [f"windowactivate --sync {self.target_window}"] if self.target_window else []
+            # The file must outlive the typing: wait for the acknowledgement
+            self._command(
+                lines + [f"type --clearmodifiers --file {path}", "getactivewindow"],
+                self.REPLY_TIMEOUT + len(text) * self.TYPE_DELAY,
+            )
+        finally:
+            os.unlink(path)
+
+    # ── xdotool process ────────────────────────────────────────────────────
+
+    def _command(self, lines: List[str], timeout: float = REPLY_TIMEOUT) -> Optional[str]:
+        """Run script lines; returns the last line they print, if any"""
+        if not self._lock.acquire(timeout=timeout):
+            return None
+        try:
+            proc = self._ensure_proc()
+            try:
+                proc.stdin.write(("\n".join(lines) + "\n").encode())
+                proc.stdin.flush()
+            except (BrokenPipeError, OSError):
+                self._stop()
+                return None
+            if not lines[-1].startswith("get"):
+                return None
+            return self._read_line(timeout)
+        finally:
+            self._lock.release()
+
+    def _ensure_proc(self) -> subprocess.Popen:
+        if self._proc is None or self._proc.poll() is not None:
+            # xdotool block-buffers stdout on a pipe; stdbuf makes replies
+            # arrive per line
+            cmd = ["xdotool", "-"]
+            if shutil.which("stdbuf"):
+                cmd = ["stdbuf", "-oL"] + cmd
+            self._proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            self._buf = b""
+        return self._proc
+
+    def _read_line(self, timeout: float) -> Optional[str]:
+        fd = self._proc.stdout.fileno()
+        while b"\n" not in self._buf:
+            ready, _, _ = select.select([fd], [], [], timeout)
+            chunk = os.read(fd, 4096) if ready else b""
+            if not chunk:
+                # Timed out or xdotool exited (a failed command ends the script)
+                self._stop()
+                return None
+            self._buf += chunk
+        line, self._buf = self._buf.split(b"\n", 1)
+        return line.decode().strip() or None
+
+    def _stop(self):
+        if self._proc is not None:
+            if self._proc.poll() is None:
+                self._proc.kill()
+            self._proc.wait()
+            self._proc = None
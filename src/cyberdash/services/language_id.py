@@ -0,0 +1,206 @@
+"""Language identification - script detection plus character trigram profiles"""
+
+import json
+import math
+import threading
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Generated by scripts/build_lang_profiles.py
+PROFILES_FILE = Path(__file__).parent.parent / "data" / "lang_profiles.json"
+
+# Only the start of long inputs is looked at
+MAX_CHARS = 2000
+
+# Below this many trigrams (about two short words), or when the runner-up
+# is within this log-likelihood of the best, the guess is not trusted
+MIN_TRIGRAMS = 12
+MIN_MARGIN = 3.0
+
+# (first code point, script); a script runs until the next start
+_SCRIPT_RANGES: List[Tuple[int, Optional[str]]] = [
+    (0x0000, "Latin"),
+    (0x0370, "Greek"),
+    (0x0400, "Cyrillic"),
+    (0x0530, None),
+    (0x0590, "Hebrew"),
+    (0x0600, "Arabic"),
+    (0x0700, None),
+    (0x0750, "Arabic"),
+    (0x0780, None),
+    (0x0900, "Devanagari"),
+    (0x0980, None),
+    (0x0E00, "Thai"),
+    (0x0E80, None),
+    (0x1100, "Hangul"),
+    (0x1200, None),
+    (0x1E00, "Latin"),
+    (0x1F00, "Greek"),
+    (0x2000, None),
+    (0x3040, "Kana"),
+    (0x3100, None),
+    (0x3400, "Han"),
+    (0x4DC0, None),
+    (0x4E00, "Han"),
+    (0xA000, None),
+    (0xAC00, "Hangul"),
+    (0xD7B0, None),
+    (0xF900, "Han"),
+    (0xFB00, None),
+    (0xFB1D, "Hebrew"),
+    (0xFB50, "Arabic"),
+    (0xFE00, None),
+    (0xFE70, "Arabic"),
+    (0xFF00, None),
+    (0xFF66, "Kana"),
+    (0xFFA0, None),
+]
+_RANGE_STARTS = [start for start, _ in _SCRIPT_RANGES]
+
+# Scripts written by a single language of LANGUAGES
+SCRIPT_LANGUAGES: Dict[str, str] = {
+    "Greek": "el",
+    "Hebrew": "he",
+    "Arabic": "ar",
+    "Devanagari": "hi",
+    "Thai": "th",
+    "Hangul": "ko",
+}
+
+
+def script_of(char: str) -> Optional[str]:
+    cp = ord(char)
+    if cp < 0x0250:
+        return "Latin"
+    return _SCRIPT_RANGES[bisect_right(_RANGE_STARTS, cp) - 1][1]
+
+
+def scan(text: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    One pass over text: letter counts per script, and counts of the
+    space-padded trigrams of Latin and Cyrillic words.
+    """
+    scripts: Dict[str, int] = {}
+    trigrams: Dict[str, int] = {}
+    word: List[str] = []
+    for char in text[:MAX_CHARS] + " ":
+        if char.isalpha():
+            script = script_of(char)
+            if script is not None:
+                scripts[script] = scripts.get(script, 0) + 1
+            if script == "Latin" or script == "Cyrillic":
+                word.append(char.lower())
+                continue
+        if word:
+            padded = " " + "".join(word) + " "
+            for i in range(len(padded) - 2):
+                gram = padded[i:i + 3]
+                trigrams[gram] = trigrams.get(gram, 0) + 1
+            word = []
+    return scripts, trigrams
+
+
+class LanguageIdentifier:
+    """
+    Non-Latin scripts mostly identify the language on their own (kana means
+    Japanese, Hangul Korean, …). Latin and Cyrillic text is scored against
+    per-language trigram log-probabilities; trigrams missing from a
+    profile get that profile's floor. Text too short to tell, or without a
+    clear winner, gets default (Russian for Cyrillic).
+    """
+
+    def __init__(self, path: Path = PROFILES_FILE):
+        self.path = path
+        # script -> languages, trigram -> [(language index, logp - floor)]
+        self._languages: Dict[str, List[str]] = {}
+        self._floors: Dict[str, List[float]] = {}
+        self._index: Dict[str, Dict[str, List[Tuple[int, float]]]] = {}
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def identify(self, text: str, default: str = "en") -> str:
+        scripts, trigrams = scan(text)
+        if not scripts:
+            return default
+
+        cjk = scripts.get("Kana", 0) + scripts.get("Han", 0)
+        script = max(scripts, key=scripts.get)
+        if cjk >= scripts[script]:
+            # Japanese mixes kanji with kana; Chinese has no kana
+            return "ja" if scripts.get("Kana", 0) * 10 >= cjk else "zh"
+        if script in SCRIPT_LANGUAGES:
+            return SCRIPT_LANGUAGES[script]
+
+        self._load()
+        fallback = "ru" if script == "Cyrillic" else default
+        languages = self._languages.get(script)
+        if not languages:
+            return fallback
+        if len(languages) == 1:
+            return languages[0]
+        total = sum(trigrams.values())
+        if total < MIN_TRIGRAMS:
+            return fallback
+
+        scores = [floor * total for floor in self._floors[script]]
+        index = self._index[script]
+        for gram, count in trigrams.items():
+            for lang, gain in index.get(gram, ()):
+                scores[lang] += gain * count
+        second, best = sorted(range(len(scores)), key=scores.__getitem__)[-2:]
+        if scores[best] - scores[second] < MIN_MARGIN:
+            return fallback
+        return languages[best]
+
+    def _load(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self._read_profiles()
+                # Only now, so other threads never see half-filled tables
+                self._loaded = True
+
+    def _read_profiles(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Language profiles load error: {e}")
+            return
+
+        for code, profile in data["profiles"].items():
+            script = profile["script"]
+            languages = self._languages.setdefault(script, [])
+            floors = self._floors.setdefault(script, [])
+            index = self._index.setdefault(script, {})
+            lang = len(languages)
+            languages.append(code)
+            floors.append(profile["floor"])
+            for gram, logp in zip(profile["grams"], profile["logp"]):
+                index.setdefault(gram, []).append((lang, logp - profile["floor"]))
+
+
+def build_profile(trigrams: Dict[str, int], size: int) -> dict:
+    """Most frequent trigrams with their log-probabilities, for the profiles file"""
+    total = sum(trigrams.values())
+    top = sorted(trigrams.items(), key=lambda kv: (-kv[1], kv[0]))[:size]
+    # Unseen trigrams: half as likely as the rarest one kept
+    floor = math.log(top[-1][1] / 2 / total)
+    return {
+        "floor": round(floor, 2),
+        "grams": [gram for gram, _ in top],
+        "logp": [round(math.log(count / total), 2) for _, count in top],
+    }
+
+
+_default: Optional[LanguageIdentifier] = None
+
+
+def identify(text: str, default: str = "en") -> str:
+    """Language code of text, using the bundled profiles (loaded once)"""
+    global _default
+    if _default is None:
+        _default = LanguageIdentifier()
+    return _default.identify(text, default)
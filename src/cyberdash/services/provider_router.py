@@ -0,0 +1,223 @@
+"""Provider Router - health tracking, latency-aware ordering and failover"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeout
+from statistics import median
+from typing import Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+from .http_pool import HTTPError
+
+T = TypeVar("T")
+
+
+class TranslationCancelled(Exception):
+    """A newer request superseded this one before it reached the provider"""
+
+
+class ProviderStats:
+    """Recent calls to one provider and the state of its circuit breaker"""
+
+    WINDOW = 20
+
+    def __init__(self):
+        # (seconds, succeeded), newest last
+        self.samples: Deque[Tuple[float, bool]] = deque(maxlen=self.WINDOW)
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.cooldown = 0.0
+        self.rate_limited_until = 0.0
+
+    def latency(self) -> Optional[float]:
+        times = [seconds for seconds, ok in self.samples if ok]
+        return median(times) if times else None
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(not ok for _, ok in self.samples) / len(self.samples)
+
+
+class ProviderRouter:
+    """
+    Orders providers for each request and fails over along that order.
+    A provider is skipped while its circuit is open, after repeated
+    failures or a high recent error rate, for a cooldown that doubles on
+    each new trip, and while it is rate limited (HTTP 429). Once the
+    cooldown ends it gets one trial request; success closes the circuit.
+    Providers that were never measured are only tried as a fallback, so
+    routing does not wander off the chosen provider on its own.
+    """
+
+    FAILURE_THRESHOLD = 3
+    ERROR_RATE_THRESHOLD = 0.5
+    MIN_SAMPLES = 5
+    BASE_COOLDOWN = 15.0
+    MAX_COOLDOWN = 300.0
+    RATE_LIMIT_COOLDOWN = 60.0
+
+    def __init__(self, providers: List[str]):
+        self._stats: Dict[str, ProviderStats] = {p: ProviderStats() for p in providers}
+        self._lock = threading.Lock()
+        self._hedger = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hedge")
+
+    def latency(self, provider: str) -> Optional[float]:
+        """Median response time of recent successful calls, seconds"""
+        with self._lock:
+            return self._get(provider).latency()
+
+    def order(self, preferred: str, eligible: List[str], fastest: bool = True) -> List[str]:
+        """
+        Providers to try, best first: the fastest healthy one, or the
+        preferred one while it is healthy when fastest is False. With every
+        circuit open, the one that reopens soonest is still tried.
+        """
+        now = time.monotonic()
+        with self._lock:
+            healthy = [p for p in eligible if self._available(p, now)]
+            if not healthy:
+                return sorted(eligible, key=lambda p: self._blocked_until(p))[:1]
+
+            def rank(provider: str):
+                latency = self._get(provider).latency()
+                measured = latency if latency is not None else float("inf")
+                if fastest:
+                    return measured, provider != preferred
+                return provider != preferred, measured
+
+            return sorted(healthy, key=rank)
+
+    def call(
+        self,
+        order: List[str],
+        request: Callable[[str], T],
+        hedge_after: Optional[float] = None,
+    ) -> Tuple[T, str]:
+        """
+        request(provider) along order until one succeeds; returns (result,
+        provider). With hedge_after, a request still running after that many
+        seconds is raced against the next provider. Raises RuntimeError
+        with every provider's error when all of them fail.
+        """
+        errors: List[str] = []
+        last: Optional[Exception] = None
+        i = 0
+        while i < len(order):
+            racing = hedge_after is not None and i + 1 < len(order)
+            attempts = order[i:i + 2] if racing else order[i:i + 1]
+            i += len(attempts)
+            try:
+                if racing:
+                    return self._race(attempts[0], attempts[1], request, hedge_after)
+                return self._attempt(attempts[0], request), attempts[0]
+            except TranslationCancelled:
+                raise
+            except _Failures as failures:
+                errors += failures.messages
+                last = failures.last
+            except Exception as e:
+                errors.append(f"{attempts[0]}: {e}")
+                last = e
+        raise RuntimeError("; ".join(errors) or "No translation provider available") from last
+
+    def close(self):
+        self._hedger.shutdown(wait=False, cancel_futures=True)
+
+    # ── Calls ──────────────────────────────────────────────────────────────
+
+    def _attempt(self, provider: str, request: Callable[[str], T]) -> T:
+        started = time.monotonic()
+        try:
+            result = request(provider)
+        except TranslationCancelled:
+            raise
+        except Exception as e:
+            self._record(provider, time.monotonic() - started, e)
+            raise
+        self._record(provider, time.monotonic() - started, None)
+        return result
+
+    def _race(self, first: str, second: str, request, hedge_after: float):
+        primary = self._hedger.submit(self._attempt, first, request)
+        try:
+            return primary.result(timeout=hedge_after), first
+        except FutureTimeout:
+            pass
+        except TranslationCancelled:
+            raise
+        except Exception as e:
+            # Failed fast: plain failover to the second one
+            try:
+                return self._attempt(second, request), second
+            except TranslationCancelled:
+                raise
+            except Exception as e2:
+                raise _Failures([f"{first}: {e}", f"{second}: {e2}"], e2)
+
+        # Slow: whichever answers first wins, the other's result is dropped
+        pending = {primary: first, self._hedger.submit(self._attempt, second, request): second}
+        messages = []
+        last = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    return future.result(), provider
+                except TranslationCancelled:
+                    raise
+                except Exception as e:
+                    messages.append(f"{provider}: {e}")
+                    last = e
+        raise _Failures(messages, last)
+
+    # ── Health (lock held) ─────────────────────────────────────────────────
+
+    def _get(self, provider: str) -> ProviderStats:
+        stats = self._stats.get(provider)
+        if stats is None:
+            stats = self._stats[provider] = ProviderStats()
+        return stats
+
+    def _available(self, provider: str, now: float) -> bool:
+        return self._blocked_until(provider) <= now
+
+    def _blocked_until(self, provider: str) -> float:
+        stats = self._get(provider)
+        return max(stats.open_until, stats.rate_limited_until)
+
+    def _record(self, provider: str, seconds: float, error: Optional[Exception]):
+        now = time.monotonic()
+        with self._lock:
+            stats = self._get(provider)
+            stats.samples.append((seconds, error is None))
+            if error is None:
+                # A successful (trial) call closes the circuit
+                stats.consecutive_failures = 0
+                stats.cooldown = 0.0
+                return
+
+            if isinstance(error, HTTPError) and error.status == 429:
+                stats.rate_limited_until = now + self.RATE_LIMIT_COOLDOWN
+                return
+
+            stats.consecutive_failures += 1
+            tripped = stats.consecutive_failures >= self.FAILURE_THRESHOLD or (
+                len(stats.samples) >= self.MIN_SAMPLES
+                and stats.error_rate() >= self.ERROR_RATE_THRESHOLD
+            )
+            # A failed trial after a cooldown reopens it for twice as long
+            if tripped or stats.cooldown:
+                stats.cooldown = min(stats.cooldown * 2 or self.BASE_COOLDOWN, self.MAX_COOLDOWN)
+                stats.open_until = now + stats.cooldown
+
+
+class _Failures(Exception):
+    """Several providers of one hedged attempt failed"""
+
+    def __init__(self, messages: List[str], last: Optional[Exception]):
+        super().__init__("; ".join(messages))
+        self.messages = messages
+        self.last = last
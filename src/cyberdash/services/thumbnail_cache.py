@@ -0,0 +1,118 @@
+"""Thumbnail Cache - downscaled previews of image clipboard entries"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import gi
+gi.require_version("GdkPixbuf", "2.0")
+from gi.repository import GdkPixbuf, GLib
+
+
+class ThumbnailCache:
+    """
+    Thumbnails are produced once per image (decoded and scaled on a worker
+    thread), saved as small PNGs, and evicted least-recently-used once the
+    cache directory grows past max_bytes. Recently shown ones are also kept
+    in memory, so recycled list rows rebind instantly. Callbacks run on
+    the main loop. A source that does not exist yet (its blob is still
+    queued for writing) is looked for again a few times.
+    """
+
+    SIZE = 96
+    MEMORY_ITEMS = 64
+    RETRY_MS = 200
+    RETRIES = 10
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = 32 * 1024 * 1024):
+        self.cache_dir = cache_dir or Path.home() / ".cache" / "cyberdash" / "thumbnails"
+        self.max_bytes = max_bytes
+        self._total: Optional[int] = None
+        self._memory: "OrderedDict[str, GdkPixbuf.Pixbuf]" = OrderedDict()
+        self._pending: Dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnails")
+
+    def request(self, key: str, source: Path, callback: Callable[[GdkPixbuf.Pixbuf], None]):
+        """Call callback(pixbuf) on the main loop once the thumbnail is ready"""
+        pixbuf = self._memory.get(key)
+        if pixbuf is not None:
+            self._memory.move_to_end(key)
+            callback(pixbuf)
+            return
+        with self._lock:
+            waiting = self._pending.setdefault(key, [])
+            waiting.append(callback)
+            if len(waiting) > 1:
+                return
+        self._worker.submit(self._load, key, source)
+
+    def close(self):
+        self._worker.shutdown(wait=False, cancel_futures=True)
+
+    # ── Worker thread ──────────────────────────────────────────────────────
+
+    def _load(self, key: str, source: Path, attempt: int = 0):
+        pixbuf = None
+        try:
+            pixbuf = self._thumbnail(key, source)
+        except GLib.Error as e:
+            print(f"Thumbnail error: {e}")
+        if pixbuf is None and attempt < self.RETRIES and not source.exists():
+            # Callbacks stay pending; new requests for key keep joining them
+            GLib.timeout_add(self.RETRY_MS, self._retry, key, source, attempt + 1)
+            return
+        with self._lock:
+            callbacks = self._pending.pop(key, [])
+        if pixbuf is not None:
+            GLib.idle_add(self._deliver, key, pixbuf, callbacks)
+
+    def _retry(self, key, source, attempt):
+        try:
+            self._worker.submit(self._load, key, source, attempt)
+        except RuntimeError:
+            pass  # closed
+        return False
+
+    def _deliver(self, key, pixbuf, callbacks):
+        self._memory[key] = pixbuf
+        if len(self._memory) > self.MEMORY_ITEMS:
+            self._memory.popitem(last=False)
+        for callback in callbacks:
+            callback(pixbuf)
+        return False
+
+    def _thumbnail(self, key: str, source: Path) -> Optional[GdkPixbuf.Pixbuf]:
+        path = self.cache_dir / f"{key}.png"
+        if path.exists():
+            os.utime(path)  # mark as recently used
+            return GdkPixbuf.Pixbuf.new_from_file(str(path))
+        if not source.exists():
+            return None
+
+        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(str(source), self.SIZE, self.SIZE, True)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        pixbuf.savev(str(tmp), "png", [], [])
+        os.replace(tmp, path)
+        self._account(path.stat().st_size)
+        return pixbuf
+
+    def _account(self, added: int):
+        if self._total is None:
+            self._total = sum(p.stat().st_size for p in self.cache_dir.glob("*.png"))
+        else:
+            self._total += added
+        if self._total <= self.max_bytes:
+            return
+        # Evict oldest-used until under 3/4 of the budget
+        files = sorted(self.cache_dir.glob("*.png"), key=lambda p: p.stat().st_mtime)
+        for p in files:
+            if self._total <= self.max_bytes * 3 // 4:
+                break
+            size = p.stat().st_size
+            p.unlink(missing_ok=True)
+            self._total -= size
@@ -0,0 +1,146 @@
+"""Translation Cache - in-memory LRU over a persistent SQLite store"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """
+    NFC with spaces collapsed within each line: trivially different inputs
+    share a key, but line breaks (which the translation keeps) still count
+    """
+    lines = unicodedata.normalize("NFC", text).splitlines()
+    return "\n".join(" ".join(line.split()) for line in lines).strip("\n")
+
+
+class TranslationCache:
+    """
+    Translation memory keyed on (provider, source, target, normalized text).
+    Hits are served from an OrderedDict LRU, then from disk; disk rows
+    expire after ttl seconds and the least recently used ones are evicted
+    once the table grows past max_rows. Safe to use from worker threads.
+    """
+
+    MEMORY_ITEMS = 512
+    EVICT_EVERY = 100
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttl: float = 30 * 24 * 3600,
+        max_rows: int = 20000,
+    ):
+        self.path = path or Path.home() / ".cache" / "cyberdash" / "translations.db"
+        self.ttl = ttl
+        self.max_rows = max_rows
+        # key -> (result, created)
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._puts = 0
+
+    @staticmethod
+    def make_key(provider: str, source: str, target: str, text: str) -> str:
+        raw = "\0".join((provider, source, target, normalize_text(text)))
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, provider: str, source: str, target: str, text: str) -> Optional[str]:
+        key = self.make_key(provider, source, target, text)
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None and hit[1] > now - self.ttl:
+                self._memory.move_to_end(key)
+                return hit[0]
+            try:
+                db = self._open()
+                row = db.execute(
+                    "SELECT result, created FROM translations WHERE key = ? AND created > ?",
+                    (key, now - self.ttl),
+                ).fetchone()
+                if row is None:
+                    return None
+                db.execute("UPDATE translations SET used = ? WHERE key = ?", (now, key))
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"Translation cache error: {e}")
+                return None
+            self._remember(key, row[0], row[1])
+            return row[0]
+
+    def put(self, provider: str, source: str, target: str, text: str, result: str):
+        key = self.make_key(provider, source, target, text)
+        now = time.time()
+        with self._lock:
+            self._remember(key, result, now)
+            try:
+                db = self._open()
+                db.execute(
+                    "INSERT OR REPLACE INTO translations(key, result, created, used) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, result, now, now),
+                )
+                self._puts += 1
+                if self._puts % self.EVICT_EVERY == 0:
+                    self._evict(db, now)
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"Translation cache error: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            try:
+                self._open().execute("DELETE FROM translations")
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Translation cache error: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # ── Internals (lock held) ──────────────────────────────────────────────
+
+    def _remember(self, key: str, result: str, created: float):
+        self._memory[key] = (result, created)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.MEMORY_ITEMS:
+            self._memory.popitem(last=False)
+
+    def _open(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    key     TEXT PRIMARY KEY,
+                    result  TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    used    REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS translations_used ON translations(used);
+            """)
+            self._evict(db, time.time())
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _evict(self, db: sqlite3.Connection, now: float):
+        """Drop expired rows, then least recently used ones past max_rows"""
+        db.execute("DELETE FROM translations WHERE created <= ?", (now - self.ttl,))
+        db.execute(
+            "DELETE FROM translations WHERE key IN "
+            "(SELECT key FROM translations ORDER BY used DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
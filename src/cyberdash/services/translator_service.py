@@ -1,8 +1,18 @@
 """Translator Service - Multiple providers"""
 
-import subprocess
+import json
 import os
-from typing import Tuple, Dict, List
+import re
+import threading
+import urllib.parse
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterator, Tuple, Dict, List, Optional
+
+from . import language_id
+from .http_pool import HTTPError, HttpPool
+from .input_injector import InputInjector
+from .provider_router import ProviderRouter, TranslationCancelled
+from .translation_cache import TranslationCache
 
 
 LANGUAGES: Dict[str, str] = {
@@ -37,13 +47,60 @@ LANGUAGES: Dict[str, str] = {
 }
 
 
+# Requests in flight at once per provider; MyMemory rate-limits per IP and
+# a local Ollama serves one generation at a time
+PROVIDER_LIMITS: Dict[str, int] = {"mymemory": 2, "libretranslate": 2, "openai": 4, "ollama": 1}
+
+# Providers that can send the translation as it is generated
+STREAMING_PROVIDERS = {"openai", "ollama"}
+
+# translate_many() request sizes; LibreTranslate takes an array "q", LLMs
+# get one prompt with numbered segments
+LIBRE_BATCH_ITEMS = 50
+LIBRE_BATCH_CHARS = 5000
+LLM_BATCH_ITEMS = 40
+LLM_BATCH_CHARS = 2000
+# MyMemory has no batch endpoint: segments go one per line of a query,
+# which it caps at 500 bytes
+MYMEMORY_BATCH_ITEMS = 20
+MYMEMORY_BATCH_BYTES = 500
+
+# Response time estimate before a provider is measured, seconds
+DEFAULT_LATENCY = 0.5
+
+# callback(result, detected, error, provider), run on the main loop; provider
+# answered the request (None when nothing had to be translated)
+TranslateCallback = Callable[[Optional[str], Optional[str], Optional[str], Optional[str]], None]
+# on_partial(text_so_far), run on a worker thread; returns False to abort
+PartialCallback = Callable[[str], bool]
+
+
 class TranslatorService:
     LANGUAGES = LANGUAGES
 
-    def __init__(self, config):
+    def __init__(
+        self,
+        config,
+        injector: Optional[InputInjector] = None,
+        cache: Optional[TranslationCache] = None,
+        http: Optional[HttpPool] = None,
+    ):
         self.config = config
+        self.injector = injector or InputInjector()
+        self.cache = cache or TranslationCache()
+        # Keep-alive connections, shared by all providers
+        self.http = http or HttpPool()
         self.provider = config.get("translator_provider", "mymemory")
         self.last_detected = "en"
+        self._slots = {name: threading.BoundedSemaphore(n) for name, n in PROVIDER_LIMITS.items()}
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="translator")
+        self._async_lock = threading.Lock()
+        self._request_id = 0
+        # channel -> newest request id, and its future while queued or running
+        self._latest: Dict[str, int] = {}
+        self._futures: Dict[str, Future] = {}
+        # Health and latency of each provider, failover order
+        self.router = ProviderRouter(list(PROVIDER_LIMITS))
 
     def reload_config(self):
         self.provider = self.config.get("translator_provider", "mymemory")
@@ -53,81 +110,286 @@ class TranslatorService:
         self.config.set("translator_provider", provider)
 
     def detect_language(self, text: str) -> str:
-        """Heuristic language detection"""
-        if not text:
-            return "en"
-
-        def ratio(start, end):
-            count = sum(1 for c in text if start <= c <= end)
-            return count / max(len(text), 1)
-
-        if ratio("\u3040", "\u30FF") > 0.1:
-            return "ja"
-        if ratio("\uAC00", "\uD7AF") > 0.1:
-            return "ko"
-        if ratio("\u4E00", "\u9FFF") > 0.1:
-            return "zh"
-        if ratio("\u0600", "\u06FF") > 0.1:
-            return "ar"
-        if ratio("\u0400", "\u04FF") > 0.1:
-            return "ru"
-
-        words = set(text.lower().split())
-        if len(words & {"el","la","los","las","de","que","es","en","un","una","por","con","para","se","lo"}) >= 2:
-            return "es"
-        if len(words & {"le","la","les","de","des","un","une","et","est","que","qui","dans","je","tu"}) >= 2:
-            return "fr"
-        if len(words & {"der","die","das","und","ist","ein","eine","von","mit","den","dem","ich","du"}) >= 2:
-            return "de"
-        return "en"
+        """Script detection, then trigram profiles for Latin and Cyrillic text"""
+        return language_id.identify(text, default="en")
 
     def translate(self, text: str, source: str = "auto", target: str = "es") -> Tuple[str, str]:
         """Translate text. Returns (translated_text, detected_source_lang)"""
+        result, detected, _ = self._translate(text, source, target)
+        return result, detected
+
+    def translate_async(
+        self,
+        text: str,
+        source: str,
+        target: str,
+        callback: TranslateCallback,
+        channel: str = "default",
+        on_partial: Optional[Callable[[str], None]] = None,
+    ) -> int:
+        """
+        Translate on a worker thread and return the request id. Each channel
+        only delivers its newest request: submitting another one cancels the
+        previous if it has not reached the provider yet, and drops its
+        result otherwise, so a slow older response never overwrites a newer
+        one. With a streaming provider, on_partial(text_so_far) is called
+        from the worker thread as the translation arrives.
+        """
+        def work(is_current):
+            def report(so_far: str) -> bool:
+                # Stop reading the stream once superseded
+                if not is_current():
+                    return False
+                on_partial(so_far)
+                return True
+
+            return self._translate(
+                text, source, target, is_current, report if on_partial is not None else None
+            )
+
+        return self._submit(channel, callback, work)
+
+    def translate_many_async(
+        self,
+        segments: List[str],
+        source: str,
+        target: str,
+        callback: Callable[[Optional[List[str]], Optional[str], Optional[str], Optional[str]], None],
+        channel: str = "default",
+    ) -> int:
+        """translate_many() on a worker thread, delivered like translate_async()"""
+        return self._submit(
+            channel,
+            callback,
+            lambda is_current: self._translate_many(segments, source, target, is_current),
+        )
+
+    def cancel(self, channel: str = "default"):
+        """Drop the pending request of a channel, if any"""
+        with self._async_lock:
+            self._latest.pop(channel, None)
+            previous = self._futures.pop(channel, None)
+        if previous is not None:
+            previous.cancel()
+
+    def _is_current(self, channel: str, request_id: int) -> bool:
+        return self._latest.get(channel) == request_id
+
+    def _submit(self, channel: str, callback, work: Callable[[Callable[[], bool]], tuple]) -> int:
+        with self._async_lock:
+            self._request_id += 1
+            request_id = self._request_id
+            self._latest[channel] = request_id
+            previous = self._futures.get(channel)
+            self._futures[channel] = self._executor.submit(
+                self._run_async, request_id, channel, callback, work
+            )
+        if previous is not None:
+            previous.cancel()
+        return request_id
+
+    def _run_async(self, request_id, channel, callback, work):
+        def is_current():
+            return self._is_current(channel, request_id)
+
+        if not is_current():
+            return
+        try:
+            result, detected, provider = work(is_current)
+            outcome = (result, detected, None, provider)
+        except TranslationCancelled:
+            return
+        except Exception as e:
+            outcome = (None, None, str(e), None)
+        from gi.repository import GLib
+        GLib.idle_add(self._deliver, request_id, channel, callback, outcome)
+
+    def _deliver(self, request_id, channel, callback, outcome):
+        # A newer request may have been submitted while this one was queued
+        if self._is_current(channel, request_id):
+            with self._async_lock:
+                self._latest.pop(channel, None)
+                self._futures.pop(channel, None)
+            callback(*outcome)
+        return False
+
+    def _translate(
+        self,
+        text: str,
+        source: str,
+        target: str,
+        is_current: Callable[[], bool] = lambda: True,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> Tuple[str, str, Optional[str]]:
+        """(translation, source language, provider that answered)"""
         if not text.strip():
-            return "", source
+            return "", source, None
 
         if source == "auto":
             source = self.detect_language(text)
             self.last_detected = source
 
         if source == target:
-            return text, source
+            return text, source, None
+
+        order = self._route()
+        cached = self._cached(order, source, target, text)
+        if cached is not None:
+            return cached[0], source, cached[1]
+
+        # Two streams racing into one output would interleave: a streaming
+        # provider first in line streams unhedged, otherwise a hedged call
+        # does not stream at all
+        hedge = self._hedge_after()
+        if on_partial is not None:
+            if order[0] in STREAMING_PROVIDERS:
+                hedge = None
+            elif hedge is not None:
+                on_partial = None
+
+        def request(provider: str) -> Tuple[str, str]:
+            slot = self._slots.get(provider, self._slots["mymemory"])
+            with slot:
+                # Waiting for a free slot can take a while; skip stale requests
+                if not is_current():
+                    raise TranslationCancelled()
+                return self._request(provider, text, source, target, on_partial)
+
+        (result, detected), provider = self.router.call(order, request, hedge)
+        self.cache.put(provider, source, target, text, result)
+        return result, detected, provider
+
+    def translate_many(
+        self, segments: List[str], source: str = "auto", target: str = "es"
+    ) -> Tuple[List[str], str]:
+        """
+        Translate several segments with as few provider requests as possible.
+        Returns (translations in input order, detected_source_lang). Cached
+        and repeated segments are not sent; blank ones are returned as is.
+        """
+        results, detected, _ = self._translate_many(segments, source, target)
+        return results, detected
+
+    def _translate_many(
+        self,
+        segments: List[str],
+        source: str,
+        target: str,
+        is_current: Callable[[], bool] = lambda: True,
+    ) -> Tuple[List[str], str, Optional[str]]:
+        """(translations, source language, provider that answered)"""
+        if source == "auto":
+            source = self.detect_language(" ".join(segments))
+            self.last_detected = source
 
-        try:
-            if self.provider == "mymemory":
-                return self._mymemory(text, source, target)
-            elif self.provider == "libretranslate":
-                return self._libretranslate(text, source, target)
-            elif self.provider == "openai":
-                return self._openai(text, source, target)
-            elif self.provider == "ollama":
-                return self._ollama(text, source, target)
+        if source == target:
+            return list(segments), source, None
+
+        results = list(segments)
+        answered: Optional[str] = None
+
+        order = self._route()
+        # Unique text -> positions waiting for it
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(segments):
+            if not text.strip():
+                continue
+            cached = self._cached(order, source, target, text)
+            if cached is not None:
+                results[i], answered = cached
             else:
-                return self._mymemory(text, source, target)
-        except Exception as e:
-            raise RuntimeError(f"{self.provider}: {e}")
+                pending.setdefault(text, []).append(i)
+
+        if pending:
+            texts = list(pending)
+            translated, answered = self.router.call(
+                order,
+                lambda p: self._request_many(p, texts, source, target, is_current),
+                self._hedge_after(),
+            )
+            for text, result in zip(texts, translated):
+                self.cache.put(answered, source, target, text, result)
+                for i in pending[text]:
+                    results[i] = result
+        return results, source, answered
+
+    def _request(
+        self,
+        provider: str,
+        text: str,
+        source: str,
+        target: str,
+        on_partial: Optional[PartialCallback] = None,
+    ) -> Tuple[str, str]:
+        if provider == "libretranslate":
+            return self._libretranslate(text, source, target)
+        if provider == "openai":
+            return self._openai(text, source, target, on_partial)
+        if provider == "ollama":
+            return self._ollama(text, source, target, on_partial)
+        return self._mymemory(text, source, target)
+
+    def expected_latency(self, provider: Optional[str] = None) -> float:
+        """Recent response time of a provider in seconds, a guess until measured"""
+        latency = self.router.latency(provider or self.provider)
+        return DEFAULT_LATENCY if latency is None else latency
+
+    # ── Routing ────────────────────────────────────────────────────────────
+
+    def _route(self) -> List[str]:
+        """Providers to try for the next request, best first"""
+        if not self.config.get("translator_failover", True):
+            return [self.provider]
+        fastest = self.config.get("translator_routing", "fixed") == "fastest"
+        return self.router.order(self.provider, self._eligible(), fastest)
+
+    def _eligible(self) -> List[str]:
+        """
+        The chosen provider plus those the user configured explicitly; text
+        never goes to a provider (like the public MyMemory) only by default
+        """
+        api_keys = self.config.get("api_keys", {})
+        eligible = [self.provider]
+        # The public libretranslate.com instance needs a key, a self-hosted one may not
+        if api_keys.get("libretranslate_key") or api_keys.get(
+            "libretranslate_url", "https://libretranslate.com"
+        ) != "https://libretranslate.com":
+            eligible.append("libretranslate")
+        if api_keys.get("openai"):
+            eligible.append("openai")
+        if api_keys.get("ollama_url"):
+            eligible.append("ollama")
+        return list(dict.fromkeys(eligible))
+
+    def _hedge_after(self) -> Optional[float]:
+        hedge_ms = self.config.get("translator_hedge_ms", 0)
+        return hedge_ms / 1000 if hedge_ms else None
+
+    def _cached(
+        self, order: List[str], source: str, target: str, text: str
+    ) -> Optional[Tuple[str, str]]:
+        """(translation, provider) from the first provider in order that has one"""
+        for provider in order:
+            cached = self.cache.get(provider, source, target, text)
+            if cached is not None:
+                return cached, provider
+        return None
 
     def _mymemory(self, text: str, source: str, target: str) -> Tuple[str, str]:
-        import urllib.request
-        import urllib.parse
-        import json
-
         params = urllib.parse.urlencode({"q": text, "langpair": f"{source}|{target}"})
-        url = f"https://api.mymemory.translated.net/get?{params}"
-
-        req = urllib.request.Request(url, headers={"User-Agent": "CyberDash/1.0"})
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read())
+        data = self.http.request_json(
+            "GET", f"https://api.mymemory.translated.net/get?{params}", timeout=10
+        )
 
-        if data.get("responseStatus") == 200:
+        status = int(data.get("responseStatus") or 0)
+        if status == 200:
             return data["responseData"]["translatedText"], source
+        if status == 429:
+            # Daily free quota used up; reported with a 200 response
+            raise HTTPError(429, data.get("responseDetails", "Too Many Requests"))
         raise RuntimeError(data.get("responseDetails", "MyMemory error"))
 
     def _libretranslate(self, text: str, source: str, target: str) -> Tuple[str, str]:
-        import urllib.request
-        import urllib.parse
-        import json
-
         api_keys = self.config.get("api_keys", {})
         url = api_keys.get("libretranslate_url", "https://libretranslate.com")
         key = api_keys.get("libretranslate_key", "")
@@ -136,79 +398,259 @@ class TranslatorService:
         if key:
             payload["api_key"] = key
 
-        data_bytes = json.dumps(payload).encode()
-        req = urllib.request.Request(
-            f"{url}/translate",
-            data=data_bytes,
-            headers={"Content-Type": "application/json"},
-        )
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            result = json.loads(resp.read())
+        result = self.http.request_json("POST", f"{url}/translate", payload, timeout=15)
 
         if "translatedText" in result:
             return result["translatedText"], source
         raise RuntimeError(result.get("error", "LibreTranslate error"))
 
-    def _openai(self, text: str, source: str, target: str) -> Tuple[str, str]:
-        import urllib.request
-        import json
+    def _openai(
+        self, text: str, source: str, target: str, on_partial: Optional[PartialCallback] = None
+    ) -> Tuple[str, str]:
+        return self._openai_chat(_prompt(text, source, target), 1000, on_partial), source
 
+    def _openai_chat(
+        self, prompt: str, max_tokens: int, on_partial: Optional[PartialCallback] = None
+    ) -> str:
         api_key = self.config.get("api_keys", {}).get("openai", "")
         if not api_key:
             raise RuntimeError("OpenAI API key not configured")
 
-        src_name = LANGUAGES.get(source, source)
-        tgt_name = LANGUAGES.get(target, target)
-        prompt = f"Translate from {src_name} to {tgt_name}. Return ONLY the translation:\n\n{text}"
-
         payload = {
             "model": "gpt-3.5-turbo",
             "messages": [{"role": "user", "content": prompt}],
-            "max_tokens": 1000,
+            "max_tokens": max_tokens,
         }
-        req = urllib.request.Request(
+        if on_partial is not None:
+            # Server-sent events, one delta per token
+            payload["stream"] = True
+            with self.http.stream(
+                "POST",
+                "https://api.openai.com/v1/chat/completions",
+                json.dumps(payload).encode(),
+                {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+                timeout=30,
+            ) as resp:
+                tokens = (
+                    json.loads(data)["choices"][0]["delta"].get("content") or ""
+                    for data in _sse_data(resp)
+                )
+                return _collect(tokens, on_partial).strip()
+
+        result = self.http.request_json(
+            "POST",
             "https://api.openai.com/v1/chat/completions",
-            data=json.dumps(payload).encode(),
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-            },
+            payload,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=30,
         )
-        with urllib.request.urlopen(req, timeout=30) as resp:
-            result = json.loads(resp.read())
 
-        return result["choices"][0]["message"]["content"].strip(), source
+        return result["choices"][0]["message"]["content"].strip()
 
-    def _ollama(self, text: str, source: str, target: str) -> Tuple[str, str]:
-        import urllib.request
-        import json
+    def _ollama(
+        self, text: str, source: str, target: str, on_partial: Optional[PartialCallback] = None
+    ) -> Tuple[str, str]:
+        return self._ollama_generate(_prompt(text, source, target), on_partial), source
 
-        url = self.config.get("api_keys", {}).get("ollama_url", "http://localhost:11434")
-        src_name = LANGUAGES.get(source, source)
-        tgt_name = LANGUAGES.get(target, target)
-        prompt = f"Translate from {src_name} to {tgt_name}. Return ONLY the translation:\n\n{text}"
+    def _ollama_generate(self, prompt: str, on_partial: Optional[PartialCallback] = None) -> str:
+        url = self.config.get("api_keys", {}).get("ollama_url") or "http://localhost:11434"
 
-        payload = {"model": "llama2", "prompt": prompt, "stream": False}
-        req = urllib.request.Request(
-            f"{url}/api/generate",
-            data=json.dumps(payload).encode(),
-            headers={"Content-Type": "application/json"},
-        )
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            result = json.loads(resp.read())
+        payload = {"model": "llama2", "prompt": prompt, "stream": on_partial is not None}
+        if on_partial is not None:
+            # Newline-delimited JSON objects, one per token
+            with self.http.stream(
+                "POST",
+                f"{url}/api/generate",
+                json.dumps(payload).encode(),
+                {"Content-Type": "application/json"},
+                timeout=60,
+            ) as resp:
+                tokens = (json.loads(line).get("response", "") for line in _ndjson_lines(resp))
+                return _collect(tokens, on_partial).strip()
+
+        result = self.http.request_json("POST", f"{url}/api/generate", payload, timeout=60)
 
         if "response" in result:
-            return result["response"].strip(), source
+            return result["response"].strip()
         raise RuntimeError("Ollama error")
 
+    # ── Batches ────────────────────────────────────────────────────────────
+
+    def _request_many(
+        self,
+        provider: str,
+        texts: List[str],
+        source: str,
+        target: str,
+        is_current: Callable[[], bool] = lambda: True,
+    ) -> List[str]:
+        slot = self._slots.get(provider, self._slots["mymemory"])
+
+        def acquire():
+            slot.acquire()
+            if not is_current():
+                slot.release()
+                raise TranslationCancelled()
+
+        out: List[str] = []
+        if provider == "libretranslate":
+            for batch in _batches(texts, LIBRE_BATCH_ITEMS, LIBRE_BATCH_CHARS):
+                acquire()
+                try:
+                    out.extend(self._libretranslate_many(batch, source, target))
+                finally:
+                    slot.release()
+        elif provider in ("openai", "ollama"):
+            for batch in _batches(texts, LLM_BATCH_ITEMS, LLM_BATCH_CHARS):
+                acquire()
+                try:
+                    parsed = self._llm_many(provider, batch, source, target)
+                finally:
+                    slot.release()
+                # Segments the model merged or dropped are sent on their own
+                for text, result in zip(batch, parsed):
+                    if result is None:
+                        single = self._openai if provider == "openai" else self._ollama
+                        acquire()
+                        try:
+                            result = single(text, source, target)[0]
+                        finally:
+                            slot.release()
+                    out.append(result)
+        else:
+            # Rate limited per request: as few queries as the size cap allows
+            def size(text: str) -> int:
+                return len(text.encode("utf-8")) + 1
+
+            for batch in _batches(texts, MYMEMORY_BATCH_ITEMS, MYMEMORY_BATCH_BYTES, size):
+                acquire()
+                try:
+                    out.extend(self._mymemory_many(batch, source, target))
+                finally:
+                    slot.release()
+        return out
+
+    def _mymemory_many(self, texts: List[str], source: str, target: str) -> List[str]:
+        """Segments as the lines of one query, split back by line"""
+        if len(texts) > 1 and not any("\n" in text for text in texts):
+            lines = self._mymemory("\n".join(texts), source, target)[0].split("\n")
+            if len(lines) == len(texts):
+                return [line.strip() for line in lines]
+        # Lines merged or split in translation (or a single segment)
+        return [self._mymemory(text, source, target)[0] for text in texts]
+
+    def _libretranslate_many(self, texts: List[str], source: str, target: str) -> List[str]:
+        api_keys = self.config.get("api_keys", {})
+        url = api_keys.get("libretranslate_url", "https://libretranslate.com")
+        key = api_keys.get("libretranslate_key", "")
+
+        payload = {"q": texts, "source": source, "target": target, "format": "text"}
+        if key:
+            payload["api_key"] = key
+
+        result = self.http.request_json("POST", f"{url}/translate", payload, timeout=30)
+
+        translated = result.get("translatedText")
+        if isinstance(translated, list) and len(translated) == len(texts):
+            return translated
+        raise RuntimeError(result.get("error", "LibreTranslate error"))
+
+    def _llm_many(
+        self, provider: str, texts: List[str], source: str, target: str
+    ) -> List[Optional[str]]:
+        """One prompt for all segments; None where the reply lost a marker"""
+        src_name = LANGUAGES.get(source, source)
+        tgt_name = LANGUAGES.get(target, target)
+        numbered = "\n".join(f"[[{i}]] {text}" for i, text in enumerate(texts, 1))
+        prompt = (
+            f"Translate each numbered segment from {src_name} to {tgt_name}. "
+            "Keep every [[n]] marker and return ONLY the markers, each followed by "
+            f"its translation:\n\n{numbered}"
+        )
+        if provider == "openai":
+            reply = self._openai_chat(prompt, 4 * sum(len(t) for t in texts) // 3 + 100)
+        else:
+            reply = self._ollama_generate(prompt)
+
+        parsed = {int(n): seg.strip() for n, seg in _MARKER.findall(reply)}
+        return [parsed.get(i) or None for i in range(1, len(texts) + 1)]
+
     def replace_text_in_app(self, text: str) -> bool:
         """Type text into previously focused window"""
-        try:
-            subprocess.run(
-                ["xdotool", "type", "--clearmodifiers", "--", text],
-                timeout=5,
-                capture_output=True,
-            )
-            return True
-        except Exception:
-            return False
+        return self.injector.type_text(text)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.router.close()
+        self.http.close()
+        self.cache.close()
+
+
+def _prompt(text: str, source: str, target: str) -> str:
+    src_name = LANGUAGES.get(source, source)
+    tgt_name = LANGUAGES.get(target, target)
+    return f"Translate from {src_name} to {tgt_name}. Return ONLY the translation:\n\n{text}"
+
+
+# "[[n]] segment" up to the next marker
+_MARKER = re.compile(r"\[\[(\d+)\]\]\s*(.*?)(?=\[\[\d+\]\]|\Z)", re.S)
+
+
+def _batches(
+    texts: List[str], max_items: int, max_size: int, size: Callable[[str], int] = len
+) -> Iterator[List[str]]:
+    batch: List[str] = []
+    total = 0
+    for text in texts:
+        if batch and (len(batch) == max_items or total + size(text) > max_size):
+            yield batch
+            batch, total = [], 0
+        batch.append(text)
+        total += size(text)
+    if batch:
+        yield batch
+
+
+# ── Streaming ──────────────────────────────────────────────────────────────
+
+def _sse_data(resp) -> Iterator[str]:
+    """Payloads of "data:" lines of a server-sent event stream"""
+    for raw in resp:
+        line = raw.decode("utf-8").strip()
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        yield data
+    resp.read()  # drain, so the connection can be reused
+
+
+def _ndjson_lines(resp) -> Iterator[str]:
+    for raw in resp:
+        line = raw.strip()
+        if line:
+            yield line.decode("utf-8")
+
+
+def _collect(tokens: Iterator[str], on_partial: PartialCallback) -> str:
+    text = ""
+    for token in tokens:
+        if not token:
+            continue
+        text += token
+        if not on_partial(text):
+            raise TranslationCancelled()
+    return text
+
+
+# ── Sentences ──────────────────────────────────────────────────────────────
+
+# A sentence with its closing punctuation and the whitespace after it; a
+# period followed by a non-space, as in "3.5", does not end it
+_SENTENCE = re.compile(r"(?:[^.!?。！？\n]|[.!?](?=\S))*(?:[.!?。！？]+|\n|$)\s*")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Sentences of text with their trailing whitespace; joined they give text back"""
+    return [piece for piece in _SENTENCE.findall(text) if piece]
@@ -16,14 +16,32 @@ class ConfigManager:
             "hotkey": "super+period",
             "translator_provider": "mymemory",
             "target_language": "es",
+            # Re-translate while typing, after a pause
+            "live_translate": False,
+            # "fixed" prefers translator_provider, "fastest" picks the fastest
+            # healthy one; both fail over to the providers configured in
+            # api_keys on errors (never to an unconfigured one)
+            "translator_routing": "fixed",
+            "translator_failover": True,
+            # Race a second provider when a request takes longer (0 = off)
+            "translator_hedge_ms": 0,
             "api_keys": {
                 "openai": "",
-                "ollama_url": "http://localhost:11434",
+                # Empty: Ollama is only used when chosen, at localhost:11434
+                "ollama_url": "",
                 "libretranslate_url": "https://libretranslate.com",
                 "libretranslate_key": "",
             },
             "auto_paste": True,
             "max_clipboard": 50,
+            # "journal" keeps max_clipboard entries; "sqlite" archives up to
+            # clipboard_capacity entries with full-text search
+            "clipboard_backend": "journal",
+            "clipboard_capacity": 50000,
+            # Also record what other applications copy (opt-in)
+            "watch_clipboard": False,
+            # Build hidden tabs at idle time instead of on first switch
+            "prewarm_views": False,
         }
 
     def _load(self) -> Dict[str, Any]:
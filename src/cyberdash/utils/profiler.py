@@ -0,0 +1,140 @@
+"""Startup Profiler - phase and import timings for --profile-startup"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from importlib.abc import MetaPathFinder
+from typing import List, Optional, Tuple
+
+# (name, category, start_ns, duration_ns, depth)
+Event = Tuple[str, str, int, int, int]
+
+
+class _TimedLoader:
+    """Loader proxy that times exec_module and delegates everything else"""
+
+    def __init__(self, loader, profiler: "StartupProfiler", name: str):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def exec_module(self, module):
+        with self._profiler.phase(self._name, "import"):
+            self._loader.exec_module(module)
+
+
+class _ImportTimer(MetaPathFinder):
+    """First finder on sys.meta_path: wraps the loader the others find"""
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self._profiler, fullname)
+        return spec
+
+
+class StartupProfiler:
+    """
+    Records monotonic timestamps for startup phases and module imports.
+    Disabled (and free) unless enable() is called before the imports run.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.t0 = time.monotonic_ns()
+        self.events: List[Event] = []
+        self._depth = 0
+        self._finder: Optional[_ImportTimer] = None
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.t0 = time.monotonic_ns()
+        self._finder = _ImportTimer(self)
+        sys.meta_path.insert(0, self._finder)
+
+    def disable(self):
+        self.enabled = False
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    @contextmanager
+    def phase(self, name: str, category: str = "phase"):
+        if not self.enabled:
+            yield
+            return
+        depth = self._depth
+        self._depth += 1
+        start = time.monotonic_ns()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.events.append((name, category, start, time.monotonic_ns() - start, depth))
+
+    def mark(self, name: str):
+        """Instant event, e.g. first frame"""
+        if self.enabled:
+            self.events.append((name, "mark", time.monotonic_ns(), 0, 0))
+
+    # ── Output ─────────────────────────────────────────────────────────────
+
+    def print_waterfall(self, file=None, min_ms: float = 0.5):
+        """Print events in start order; imports under min_ms are folded"""
+        file = file or sys.stderr
+        events = sorted(self.events, key=lambda e: (e[2], e[4]))
+        total_ns = max((e[2] + e[3] for e in events), default=self.t0) - self.t0
+        scale = 40 / max(total_ns, 1)
+        hidden = 0
+
+        print(f"── Startup profile ({total_ns / 1e6:.1f} ms) ──", file=file)
+        for name, category, start, dur, depth in events:
+            if category == "import" and dur < min_ms * 1e6:
+                hidden += 1
+                continue
+            offset = start - self.t0
+            bar = " " * int(offset * scale) + "█" * max(1, int(dur * scale))
+            label = f"{'  ' * depth}{'▸ ' if category == 'mark' else ''}{name}"
+            print(f"{offset / 1e6:8.1f} {dur / 1e6:8.1f} ms  {bar:<41} {label}", file=file)
+        if hidden:
+            print(f"  ({hidden} imports under {min_ms} ms not shown)", file=file)
+
+    def write_trace(self, path: str):
+        """Write a Chrome trace-event JSON file (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        trace = []
+        for name, category, start, dur, _ in self.events:
+            event = {
+                "name": name,
+                "cat": category,
+                "ts": (start - self.t0) / 1000,
+                "pid": pid,
+                "tid": 1,
+            }
+            if category == "mark":
+                event.update(ph="i", s="g")
+            else:
+                event.update(ph="X", dur=dur / 1000)
+            trace.append(event)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+
+PROFILER = StartupProfiler()